@@ -0,0 +1,207 @@
+"""
+Values derived from a calendar's occurrences, kept in Django's cache and
+invalidated when the calendar, its events or its occurrences are written.
+
+Each calendar also has a generation number, bumped on every such write.
+Keys built with ``calendar_version`` include it, so rendered pages and
+template fragments cached under them are never served once the calendar
+has changed, and are left to expire. Generations are timestamps, in
+milliseconds, of the calendar's last change (or of their first use, if
+later), so ``calendar_changed`` can serve as a ``Last-Modified`` time.
+
+Invalidation is driven by the ``post_save`` and ``post_delete`` signals;
+the stored calendar of an occurrence and slug of a calendar are read on
+``pre_save``, so that moving an occurrence or renaming a calendar also
+invalidates what was cached under the old ones. Writes bypassing the
+signals - ``QuerySet.update()``, raw SQL - must be followed by a call to
+``invalidate_calendar``.
+"""
+from datetime import datetime
+import time
+
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.db.models.loading import get_model
+from django.db.models.signals import (
+    class_prepared, pre_save, post_save, post_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from calendartools import defaults
+
+__all__ = ['visibility', 'get_calendar_bounds', 'calendar_id',
+           'calendar_generation', 'calendar_changed', 'calendar_version',
+           'invalidate_calendar']
+
+# The visibility classes of users who can see none, or all, of the hidden
+# calendars, events and occurrences.
+PUBLIC, ADMIN = 'public', 'admin'
+VISIBILITIES = (PUBLIC, ADMIN)
+
+def _sees_hidden(user, kind):
+    check = getattr(defaults, 'view_hidden_%s_check' % kind)
+    return bool(user and check(user=user))
+
+def visibility(user):
+    """
+    The visibility class of ``user``: ``PUBLIC`` if they can't see any hidden
+    items, ``ADMIN`` if they can see hidden calendars, events and
+    occurrences, and otherwise the kinds of hidden items they can see, as in
+    ``'events+occurrences'``.
+    """
+    kinds = [kind for kind in ('calendars', 'events', 'occurrences')
+             if _sees_hidden(user, kind)]
+    if not kinds:
+        return PUBLIC
+    if len(kinds) == 3:
+        return ADMIN
+    return '+'.join(kinds)
+
+def _bounds_key(calendar_id, visibility):
+    return 'calendartools:bounds:%s:%s' % (calendar_id, visibility)
+
+def get_calendar_bounds(calendar, user=None):
+    """
+    Return a dict with the ``earliest_occurrence`` start and the
+    ``latest_occurrence`` finish among the occurrences of ``calendar`` that
+    ``user`` can see (both None if there aren't any). The aggregate is
+    cached per calendar and visibility class until the calendar changes.
+    """
+    # Which occurrences are visible only depends on the occurrences check.
+    key = _bounds_key(calendar.pk, ADMIN if _sees_hidden(user, 'occurrences')
+                                   else PUBLIC)
+    bounds = cache.get(key)
+    if bounds is None:
+        bounds = calendar.occurrences.visible(user).aggregate(
+            earliest_occurrence=Min('start'),
+            latest_occurrence=Max('finish'),
+        )
+        cache.set(key, bounds, defaults.CALENDAR_CACHE_TIMEOUT)
+    return bounds
+
+def _calendar_id_key(slug):
+    return 'calendartools:calendar-id:%s' % slug
+
+def calendar_id(slug):
+    """The id of the calendar with ``slug``, or None if there isn't one."""
+    key = _calendar_id_key(slug)
+    pk = cache.get(key)
+    if pk is None:
+        Calendar = get_model(defaults.CALENDAR_APP_LABEL, 'Calendar')
+        pks = Calendar.objects.filter(slug=slug).values_list('pk', flat=True)
+        pk = pks[0] if pks else None
+        if pk is not None:
+            cache.set(key, pk, defaults.CALENDAR_CACHE_TIMEOUT)
+    return pk
+
+def _generation_key(calendar_id):
+    return 'calendartools:generation:%s' % calendar_id
+
+def _now():
+    return int(time.time() * 1000)
+
+def calendar_generation(calendar_id):
+    """The generation number of the calendar with ``calendar_id``."""
+    key = _generation_key(calendar_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Starting from the time means that a generation evicted from the
+        # cache never comes back with a number already used.
+        cache.add(key, _now(), defaults.CALENDAR_CACHE_TIMEOUT)
+        generation = cache.get(key) or _now()
+    return generation
+
+def calendar_changed(calendar_id):
+    """The time, as an aware datetime, from which the calendar with
+    ``calendar_id`` is known not to have changed."""
+    return datetime.fromtimestamp(calendar_generation(calendar_id) / 1000.0,
+                                  timezone.utc)
+
+def calendar_version(calendar_id, user=None):
+    """
+    A string identifying the current state of the calendar with
+    ``calendar_id`` as ``user`` sees it: its id, generation and the user's
+    visibility class. Use it in cache keys of anything rendered from the
+    calendar, for instance ``{% cache 600 month_grid cache_version %}``.
+    """
+    return '%s.%s.%s' % (calendar_id, calendar_generation(calendar_id),
+                         visibility(user))
+
+def invalidate_calendar(*calendar_ids):
+    """Drop the cached values of the calendars with ``calendar_ids`` and
+    bump their generations."""
+    cache.delete_many([_bounds_key(calendar_id, v)
+                       for calendar_id in calendar_ids
+                       for v in VISIBILITIES])
+    for calendar_id in calendar_ids:
+        key = _generation_key(calendar_id)
+        generation = cache.get(key)
+        # If not cached, the next call to calendar_generation starts anew.
+        if generation is not None:
+            cache.set(key, max(generation + 1, _now()),
+                      defaults.CALENDAR_CACHE_TIMEOUT)
+
+
+# The attribute keeping, from just before it is saved, the stored calendar
+# id of an occurrence or slug of a calendar.
+SNAPSHOT_ATTRIBUTE = '_calendartools_snapshot'
+# The field to keep there for each model.
+SNAPSHOT_FIELDS = {'Calendar': 'slug', 'Occurrence': 'calendar'}
+
+def _calendar_ids(sender, instance):
+    """The ids of the calendars a write to ``instance`` can change, or None
+    if ``sender`` isn't one of the calendar models."""
+    previous = instance.__dict__.pop(SNAPSHOT_ATTRIBUTE, None)
+    if sender is get_model(defaults.CALENDAR_APP_LABEL, 'Calendar'):
+        # A new calendar may reuse the slug of a deleted or renamed one.
+        cache.delete_many([_calendar_id_key(slug)
+                           for slug in set([instance.slug, previous])
+                           if slug])
+        return [instance.pk]
+    if sender is get_model(defaults.CALENDAR_APP_LABEL, 'Occurrence'):
+        # Moving an occurrence changes both calendars.
+        return set(pk for pk in (instance.calendar_id, previous)
+                   if pk is not None)
+    if sender is get_model(defaults.CALENDAR_APP_LABEL, 'Event'):
+        # An event's status decides whether its occurrences are visible.
+        return set(instance.occurrences.values_list('calendar', flat=True))
+    return None
+
+def _remember_stored(sender, instance, raw=False, **kwargs):
+    """Keep the stored value of the field of ``SNAPSHOT_FIELDS``, so that
+    what was cached under it is invalidated too once ``instance`` is
+    saved."""
+    if raw or instance.pk is None:
+        return
+    values = sender._default_manager.filter(pk=instance.pk).values_list(
+        SNAPSHOT_FIELDS[sender._meta.object_name], flat=True
+    )
+    if values:
+        setattr(instance, SNAPSHOT_ATTRIBUTE, values[0])
+
+def _connect_snapshots(sender, **kwargs):
+    """Connect ``_remember_stored`` to ``sender`` if it's one of the models
+    of ``SNAPSHOT_FIELDS``."""
+    if (sender._meta.app_label == defaults.CALENDAR_APP_LABEL and
+            sender._meta.object_name in SNAPSHOT_FIELDS):
+        pre_save.connect(_remember_stored, sender=sender,
+                         dispatch_uid='calendartools.cache.pre_save')
+
+# The models may be defined before or after this module is imported.
+class_prepared.connect(_connect_snapshots,
+                       dispatch_uid='calendartools.cache.class_prepared')
+for model_name in SNAPSHOT_FIELDS:
+    model = get_model(defaults.CALENDAR_APP_LABEL, model_name,
+                      seed_cache=False, only_installed=False)
+    if model is not None:
+        _connect_snapshots(model)
+
+@receiver(post_save, dispatch_uid='calendartools.cache.post_save')
+@receiver(post_delete, dispatch_uid='calendartools.cache.post_delete')
+def _invalidate_on_write(sender, instance, raw=False, **kwargs):
+    if raw or sender._meta.app_label != defaults.CALENDAR_APP_LABEL:
+        return
+    calendar_ids = _calendar_ids(sender, instance)
+    if calendar_ids:
+        invalidate_calendar(*calendar_ids)
@@ -49,6 +49,50 @@ MAX_OCCURRENCE_DURATION = getattr(settings, 'MAX_OCCURRENCE_DURATION', None)
 # length.
 MAX_OCCURRENCE_CREATION_COUNT = getattr(settings, 'MAX_OCCURRENCE_CREATION_COUNT', 100)
 
+# When True, periods list an occurrence under every period it overlaps (so an
+# occurrence running from Monday to Wednesday shows on all three days) rather
+# than only under the period in which it starts.
+SHOW_OVERLAPPING_OCCURRENCES = getattr(settings,
+                                       'SHOW_OVERLAPPING_OCCURRENCES', False)
+
+# When True and NumPy is installed, year and tri-month periods bucket their
+# occurrences into days, weeks and months with vectorized searches over
+# epoch arrays. Without NumPy the same buckets are found by bisection.
+NUMPY_BUCKETING = getattr(settings, 'NUMPY_BUCKETING', True)
+
+# When True, the year calendar and agenda views ask the database for the
+# number of occurrences on each day instead of loading every occurrence of the
+# year, and show those counts.
+YEAR_VIEW_DAY_COUNTS = getattr(settings, 'YEAR_VIEW_DAY_COUNTS', False)
+
+# The number of period skeletons (a period's start and finish, shared by all
+# identical periods) kept for reuse. 0 disables the interning.
+PERIOD_SKELETON_CACHE_SIZE = getattr(settings, 'PERIOD_SKELETON_CACHE_SIZE',
+                                     1024)
+
+# How long, in seconds, values derived from a calendar's occurrences (such as
+# its earliest and latest occurrence) are cached. They are invalidated when the
+# calendar, its events or its occurrences are saved or deleted.
+CALENDAR_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# How long, in seconds, the calendar and agenda views cache their rendered
+# pages. Cached pages are keyed on the calendar's generation (see
+# calendartools.cache), so they are never served once it has changed. 0
+# disables the page cache.
+#
+# Generations are kept in Django's cache: with several processes, it must be
+# one they all share (memcached, redis, database...), not the default
+# per-process LocMemCache, or a process will go on serving pages of a calendar
+# changed through another.
+CALENDAR_PAGE_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_PAGE_CACHE_TIMEOUT', 0)
+
+# When True, the calendar and agenda views send ETag and Last-Modified headers
+# worked out from the calendar's generation, and answer conditional requests
+# for unchanged pages with 304 Not Modified. As for the page cache, this needs
+# a cache shared by every process, or clients keep stale pages: only enable it
+# with one.
+CALENDAR_CONDITIONAL_GET = getattr(settings, 'CALENDAR_CONDITIONAL_GET', False)
+
 # When set to a value > 0, the agenda views will be paginated by the value
 # specified.
 MAX_AGENDA_ITEMS_PER_PAGE = getattr(settings, 'MAX_AGENDA_ITEMS_PER_PAGE', 0)
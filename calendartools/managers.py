@@ -1,8 +1,58 @@
-from django.db import models
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.backends.util import typecast_date
+from django.db.models import Count, Max, Min
 from django.db.models.query import QuerySet, Q
+from django.utils import timezone
 from calendartools import defaults
 
 
+def _as_date(value):
+    """A date from a date, a datetime or (on SQLite) a timestamp string, as
+    the backends return truncated dates."""
+    if isinstance(value, basestring):
+        return typecast_date(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def utc_offset_spans(tzinfo, first, last):
+    """
+    The spans of time between the aware datetimes ``first`` and ``last``
+    during which the pytz time zone ``tzinfo`` keeps the same UTC offset, as
+    ``(since, until, offset)`` tuples. ``since`` is None for the first span
+    and ``until`` for the last one, so that they cover all time.
+    """
+    transitions = getattr(tzinfo, '_utc_transition_times', None)
+    if transitions is None:
+        return [(None, None, timezone.localtime(first, tzinfo).utcoffset())]
+    first = first.astimezone(pytz.utc).replace(tzinfo=None)
+    last = last.astimezone(pytz.utc).replace(tzinfo=None)
+    i = max(bisect_right(transitions, first) - 1, 0)
+    spans = []
+    since = None
+    while True:
+        offset = tzinfo._transition_info[i][0]
+        i += 1
+        until = None
+        if i < len(transitions) and transitions[i] <= last:
+            until = pytz.utc.localize(transitions[i])
+        if spans and spans[-1][2] == offset:
+            # Only the name or daylight saving flag changed.
+            spans[-1] = (spans[-1][0], until, offset)
+        else:
+            spans.append((since, until, offset))
+        if until is None:
+            return spans
+        since = until
+
+
 class DRYManager(models.Manager):
     """Will try and use the queryset's methods if it cannot find
     its own. This allows you to define your custom filtering/exclusion
@@ -78,6 +128,93 @@ class OccurrenceQuerySet(NonAttendanceQuerySet):
                 Q(calendar__status__in=self.hidden_statuses)
             )
 
+    def day_counts(self, tzinfo=None, by_status=False):
+        """
+        Count the occurrences starting on each day, in ``tzinfo`` (the current
+        time zone by default), and return a dict mapping those dates to their
+        count - or with ``by_status``, to a dict of counts per status.
+
+        The dates are truncated and grouped by the database, so about one row
+        per day (and status) is fetched. Only time zones not known to pytz
+        have the starts fetched and counted here.
+        """
+        tzinfo = tzinfo or timezone.get_current_timezone()
+        fields = ['status'] if by_status else []
+        counts = {}
+        for row in self._day_count_rows(tzinfo, fields):
+            day, count = row[0], row[-1]
+            # A day may come in two rows, either side of a change of offset.
+            if by_status:
+                statuses = counts.setdefault(day, {})
+                statuses[row[1]] = statuses.get(row[1], 0) + count
+            else:
+                counts[day] = counts.get(day, 0) + count
+        return counts
+
+    def _day_count_rows(self, tzinfo, fields):
+        queryset = self.order_by()
+        zone = getattr(tzinfo, 'zone', None)
+        if zone not in pytz.all_timezones_set:
+            counts = defaultdict(int)
+            for row in queryset.values_list('start', *fields).iterator():
+                start = row[0]
+                if timezone.is_aware(start):
+                    start = timezone.localtime(start, tzinfo)
+                counts[(start.date(),) + row[1:]] += 1
+            return (key + (count,) for key, count in counts.iteritems())
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        column = '%s.%s' % (qn(opts.db_table),
+                            qn(opts.get_field('start').column))
+        # The SQL below is interpolated rather than given parameters, which
+        # the GROUP BY of an extra select would lose; the zone name is safe
+        # as it has been checked against pytz's names.
+        if not settings.USE_TZ:
+            # Starts are stored in local time.
+            return self._grouped_day_rows(
+                queryset, connection.ops.date_trunc_sql('day', column), fields
+            )
+        if connection.vendor == 'postgresql':
+            return self._grouped_day_rows(
+                queryset, "DATE(%s AT TIME ZONE '%s')" % (column, zone), fields
+            )
+        # Elsewhere starts are shifted by the zone's UTC offset before being
+        # truncated, one query per span of time with the same offset.
+        if isinstance(tzinfo, pytz.tzinfo.DstTzInfo):
+            bounds = queryset.aggregate(first=Min('start'), last=Max('start'))
+            if bounds['first'] is None:
+                return []
+        else:
+            # A fixed offset: no need to know when the occurrences are.
+            now = timezone.now()
+            bounds = {'first': now, 'last': now}
+        spans = utc_offset_spans(tzinfo, bounds['first'], bounds['last'])
+        rows = []
+        for since, until, offset in spans:
+            span = queryset
+            if since is not None:
+                span = span.filter(start__gte=since)
+            if until is not None:
+                span = span.filter(start__lt=until)
+            shifted = connection.ops.date_interval_sql(
+                column, '-' if offset < timedelta(0) else '+', abs(offset)
+            )
+            rows.extend(self._grouped_day_rows(
+                span, connection.ops.date_trunc_sql('day', shifted), fields
+            ))
+        return rows
+
+    def _grouped_day_rows(self, queryset, day, fields):
+        """``(date, field values..., count)`` rows for ``queryset`` grouped
+        on the ``day`` SQL expression and ``fields``."""
+        rows = queryset.extra(select={'day': day}).values(
+            'day', *fields
+        ).annotate(count=Count('pk'))
+        return [[_as_date(row['day'])] + [row[f] for f in fields] +
+                [row['count']] for row in rows]
+
 
 class AttendanceQuerySet(CommonQuerySet):
     @property
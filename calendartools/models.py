@@ -1,2 +1,5 @@
-# Empty models.py - required for calendartools to be recognised as a
+# models.py - required for calendartools to be recognised as a
 # Django application.
+
+# Connects the signal handlers invalidating cached calendar values.
+from calendartools import cache
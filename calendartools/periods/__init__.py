@@ -1,2 +1,6 @@
 from calendartools.periods.proxybase import *
+from calendartools.periods.occurrences import *
+from calendartools.periods.cache import *
 from calendartools.periods.periods import *
+from calendartools.periods.ranges import *
+from calendartools.periods.serialization import *
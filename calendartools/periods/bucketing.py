@@ -0,0 +1,96 @@
+from bisect import bisect_left, bisect_right
+
+from calendartools import defaults
+from calendartools.utils import epoch_microseconds
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['bucket_windows']
+
+def bucket_windows(run, lo, hi, overlap, boundaries):
+    """
+    Return, for each pair of consecutive ``boundaries``, the ``(lo, hi)``
+    window of positions in the arrays of ``run`` (an ``OccurrenceRun``),
+    within ``lo:hi``, holding the occurrences that start in (or, in overlap
+    mode, may overlap) that bucket.
+
+    Uses vectorized ``searchsorted`` calls over int64 epoch arrays when NumPy
+    is available (and ``defaults.NUMPY_BUCKETING`` is on). Otherwise, when
+    there are about as many buckets as occurrences (e.g. the time slots of a
+    day) the windows come from a single merge of the occurrences with the
+    boundaries, and from bisection when the occurrences far outnumber them.
+    All give the same windows.
+    """
+    if len(boundaries) < 2:
+        return []
+    if numpy is not None and defaults.NUMPY_BUCKETING:
+        return _numpy_windows(run, lo, hi, overlap, boundaries)
+    if hi - lo < 16 * len(boundaries):
+        return _merged_windows(run, lo, hi, overlap, boundaries)
+    return _python_windows(run, lo, hi, overlap, boundaries)
+
+def _python_windows(run, lo, hi, overlap, boundaries):
+    starts = run.starts
+    # An occurrence starts within a bucket if it starts before the next one.
+    his = [bisect_left(starts, b, lo, hi) for b in boundaries[1:]]
+    if overlap:
+        los = [bisect_right(run.reach, b, lo, h)
+               for b, h in zip(boundaries, his)]
+    else:
+        los = [bisect_left(starts, b, lo, hi) for b in boundaries[:-1]]
+    return zip(los, his)
+
+def _merge(keys, values, lo, hi, strict):
+    """For each of the sorted ``values``, the first position in
+    ``keys[lo:hi]`` whose key is greater than (``strict``) or not less than
+    the value; the equivalent of bisecting for each value, in one pass."""
+    positions = []
+    position = lo
+    for value in values:
+        if strict:
+            while position < hi and keys[position] <= value:
+                position += 1
+        else:
+            while position < hi and keys[position] < value:
+                position += 1
+        positions.append(position)
+    return positions
+
+def _merged_windows(run, lo, hi, overlap, boundaries):
+    starts = run.starts
+    his = _merge(starts, boundaries[1:], lo, hi, strict=False)
+    if overlap:
+        los = _merge(run.reach, boundaries[:-1], lo, hi, strict=True)
+        los = [min(l, h) for l, h in zip(los, his)]
+    else:
+        # Each bucket starts where the previous one ended.
+        los = _merge(starts, boundaries[:1], lo, hi, strict=False) + his[:-1]
+    return zip(los, his)
+
+def _epochs(run, name):
+    """The int64 epoch array of one of ``run``'s key lists, converted once
+    and shared between all the indexes narrowed from the same root."""
+    shared = run.shared
+    key = 'epochs_%s' % name
+    if key not in shared:
+        shared[key] = numpy.array(
+            [epoch_microseconds(dt) for dt in getattr(run, name)],
+            dtype=numpy.int64
+        )
+    return shared[key]
+
+def _numpy_windows(run, lo, hi, overlap, boundaries):
+    bounds = numpy.array([epoch_microseconds(b) for b in boundaries],
+                         dtype=numpy.int64)
+    starts = _epochs(run, 'starts')[lo:hi]
+    his = starts.searchsorted(bounds[1:], side='left') + lo
+    if overlap:
+        reach = _epochs(run, 'reach')[lo:hi]
+        los = reach.searchsorted(bounds[:-1], side='right') + lo
+        los = numpy.minimum(los, his)
+    else:
+        los = starts.searchsorted(bounds[:-1], side='left') + lo
+    return zip(los.tolist(), his.tolist())
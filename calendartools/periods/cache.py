@@ -0,0 +1,214 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.utils import timezone
+
+from calendartools import defaults
+from calendartools.periods.occurrences import OccurrenceIndex
+from calendartools.periods.proxybase import DateTimeProxy
+from calendartools.utils import first_weekday
+
+__all__ = ['LazySequence', 'PeriodCache', 'PeriodSkeleton',
+           'PeriodSkeletons', 'memoized_property', 'period_skeletons']
+
+def memoized_property(func):
+    """
+    A read-only property computed once per period.
+
+    Periods have no instance ``__dict__`` (so Django's ``cached_property``
+    can't be used); values are kept in their ``_memo`` slot instead.
+    """
+    name = func.__name__
+
+    def getter(self):
+        memo = self._memo
+        if memo is None:
+            memo = self._memo = {}
+        try:
+            return memo[name]
+        except KeyError:
+            value = memo[name] = func(self)
+            return value
+    return property(getter, doc=func.__doc__)
+
+
+class LazySequence(object):
+    """
+    A read-only sequence of ``length`` items, each built by ``build(i)`` the
+    first time it is indexed or iterated over and kept from then on.
+    """
+    __slots__ = ('_build', '_items')
+
+    def __init__(self, length, build):
+        self._build = build
+        self._items = [None] * length
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._items)
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._build(index)
+        return item
+
+    def __iter__(self):
+        for i in xrange(len(self._items)):
+            yield self[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<%s: %d items>' % (self.__class__.__name__, len(self))
+
+
+class PeriodSkeleton(object):
+    """
+    The part of a period that only depends on its class and start: the
+    converted start and the (lazily computed) finish and epoch bounds. Skeletons are shared
+    by every period of the same class starting at the same time, and must
+    not be modified other than to fill in ``finish``.
+    """
+    __slots__ = ('start', 'finish', 'epochs')
+
+    def __init__(self, start):
+        self.start = start
+        self.finish = None
+        # (start, finish) in UTC epoch microseconds, once needed.
+        self.epochs = None
+
+
+class PeriodSkeletons(object):
+    """
+    An interning table of period skeletons with least-recently-used eviction.
+
+    Skeletons are looked up by the period class and the value the period is
+    constructed from, so the conversion to the period's start (and the
+    arithmetic for its finish) is done once for all the identical periods
+    built by navigation links, context processors and the like. Those still
+    get their own proxy, with the occurrences attached through a narrowed
+    ``OccurrenceIndex`` view.
+
+    The table is shared by every thread of the process; lookups hold a lock
+    while they reorder it.
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = defaults.PERIOD_SKELETON_CACHE_SIZE
+        self.maxsize = maxsize
+        self._skeletons = OrderedDict()
+        self._lock = Lock()
+
+    def key(self, period_class, dt):
+        if isinstance(dt, DateTimeProxy):
+            dt = dt._obj
+        # Naive values are converted in the current time zone, and aware
+        # ones in their own; aware datetimes at the same instant in different
+        # zones compare equal, so the zone has to be part of the key.
+        tzinfo = getattr(dt, 'tzinfo', None)
+        if tzinfo is None:
+            tzinfo = timezone.get_current_timezone()
+        key = (period_class, dt, getattr(tzinfo, 'zone', tzinfo))
+        if period_class.locale_dependent:
+            key += (first_weekday(),)
+        return key
+
+    def get(self, period_class, dt):
+        """Return the skeleton of the ``period_class`` period containing
+        ``dt``."""
+        if not self.maxsize:
+            return PeriodSkeleton(period_class.start_of(dt))
+        key = self.key(period_class, dt)
+        skeletons = self._skeletons
+        with self._lock:
+            skeleton = skeletons.pop(key, None)
+            if skeleton is not None:
+                skeletons[key] = skeleton
+                return skeleton
+        # Converted outside the lock: another thread may intern the same
+        # skeleton meanwhile, in which case theirs is kept.
+        skeleton = PeriodSkeleton(period_class.start_of(dt))
+        with self._lock:
+            skeleton = skeletons.setdefault(key, skeleton)
+            while len(skeletons) > self.maxsize:
+                skeletons.popitem(last=False)
+        return skeleton
+
+    def clear(self):
+        with self._lock:
+            self._skeletons.clear()
+
+    def __len__(self):
+        return len(self._skeletons)
+
+period_skeletons = PeriodSkeletons()
+
+
+class PeriodCache(object):
+    """
+    A registry of the periods built while handling one request.
+
+    The periods can also be built from per-day occurrence counts alone,
+    for views that only show how busy each day is; they then have no
+    occurrences, but report counts and busy days from ``day_counts``.
+
+    Every period obtained through the cache - and every child or parent
+    period those build in turn - is indexed against the same shared
+    ``occurrences`` and registered under its (class, start, time zone), so
+    asking a day in a month grid for its month returns the ``Month`` that was
+    already built rather than constructing and filtering a new one per cell.
+    """
+
+    def __init__(self, occurrences=(), overlap=False, day_counts=None):
+        self.occurrences = OccurrenceIndex.coerce(occurrences, overlap=overlap)
+        self._periods = {}
+        # Per-day aggregates standing in for the occurrences (see
+        # ``OccurrenceQuerySet.day_counts``): date -> count, and date ->
+        # {status: count} when they were counted by status.
+        self.day_counts = self.day_status_counts = None
+        if day_counts is not None:
+            self.day_counts = {}
+            for day, count in day_counts.iteritems():
+                if isinstance(count, dict):
+                    if self.day_status_counts is None:
+                        self.day_status_counts = {}
+                    self.day_status_counts[day] = count
+                    count = sum(count.itervalues())
+                self.day_counts[day] = count
+
+    def key(self, period_class, dt):
+        start = period_skeletons.get(period_class, dt).start
+        tzinfo = start.tzinfo
+        return period_class, start, getattr(tzinfo, 'zone', tzinfo)
+
+    def register(self, period):
+        """Add an already built ``period`` to the cache, under its own
+        start."""
+        start = period.start
+        tzinfo = start.tzinfo
+        key = period.__class__, start, getattr(tzinfo, 'zone', tzinfo)
+        self._periods[key] = period
+
+    def get(self, period_class, dt):
+        """Return the ``period_class`` instance containing ``dt``, building
+        it the first time it is asked for."""
+        key = self.key(period_class, dt)
+        try:
+            return self._periods[key]
+        except KeyError:
+            period = self._periods[key] = period_class(
+                key[1], occurrences=self.occurrences, period_cache=self
+            )
+            return period
+
+    def __len__(self):
+        return len(self._periods)
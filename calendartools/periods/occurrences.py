@@ -0,0 +1,238 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from math import ceil, log
+
+from django.utils import timezone
+
+from calendartools.periods.bucketing import bucket_windows
+from calendartools.utils import timedelta_to_total_seconds
+
+__all__ = ['OccurrenceIndex']
+
+# In overlap mode occurrences are grouped by duration, each group holding
+# durations up to DURATION_RATIO times shorter than its longest one. The
+# first group holds all those up to SHORTEST_DURATION seconds long: periods
+# only scan back that far for them, and every group costs a bisection per
+# period.
+DURATION_RATIO = 4
+SHORTEST_DURATION = 4 * 60 * 60
+
+def _aware(dt):
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone.get_current_timezone())
+    return dt
+
+def start_key(occurrence):
+    """Sort key for occurrences: their ``start`` as an aware datetime. Naive
+    values are interpreted in the current time zone."""
+    return _aware(occurrence.start)
+
+def finish_key(occurrence):
+    return _aware(occurrence.finish)
+
+def _duration_class(start, finish):
+    seconds = timedelta_to_total_seconds(finish - start)
+    if seconds <= SHORTEST_DURATION:
+        return 0
+    return int(ceil(log(seconds / float(SHORTEST_DURATION), DURATION_RATIO)))
+
+
+class OccurrenceRun(object):
+    """
+    Some of an index's occurrences, in start order: their starts and, in
+    overlap mode, their finishes and a running maximum of those. ``positions``
+    maps them to the index's list of all its occurrences, or is None if the
+    run holds all of them.
+    """
+
+    def __init__(self, starts, finishes=None, positions=None):
+        self.starts = starts
+        self.finishes = finishes
+        self.positions = positions
+        if finishes is not None:
+            self.reach = []
+            reach = None
+            for finish in finishes:
+                reach = finish if reach is None else max(reach, finish)
+                self.reach.append(reach)
+        # Arrays derived from the keys (see ``bucketing``).
+        self.shared = {}
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class OccurrenceIndex(object):
+    """
+    A list of occurrences sorted by start, built once and shared by a whole
+    tree of periods.
+
+    ``between`` returns a new index over the same underlying arrays, narrowed
+    to the occurrences starting inside the given bounds by bisection. Child
+    periods therefore slice their members from their parent's index in
+    O(log N + k) instead of re-scanning every occurrence passed to the root.
+
+    With ``overlap=True`` an occurrence belongs to every period it overlaps
+    (``start <= period.finish`` and ``finish > period.start``) rather than
+    only to the period it starts in, so multi-day occurrences show up on each
+    of their days. The occurrences are then split into runs of similar
+    durations (see ``DURATION_RATIO``). Within a run the finishes are kept
+    in start order alongside a running maximum of them; being sorted, that
+    maximum can be bisected for the first occurrence that may still be in
+    progress at the start of a period. As no occurrence of a run lasts much
+    longer than the others, that one started at most about as long before
+    the period as the run's occurrences last, so the few occurrences skipped
+    over because they have already finished are bounded by those still in
+    progress - a single long occurrence doesn't make every period scan the
+    short ones since its start.
+    """
+
+    def __init__(self, occurrences=(), overlap=False):
+        items = sorted(occurrences, key=start_key)
+        self._items = items
+        self.overlap = overlap
+        self.after = None
+        starts = [start_key(o) for o in items]
+        if not overlap:
+            runs = [OccurrenceRun(starts)]
+        else:
+            finishes = [finish_key(o) for o in items]
+            classes = {}
+            for i, (start, finish) in enumerate(zip(starts, finishes)):
+                classes.setdefault(_duration_class(start, finish),
+                                   []).append(i)
+            if len(classes) <= 1:
+                runs = [OccurrenceRun(starts, finishes)]
+            else:
+                runs = [OccurrenceRun([starts[i] for i in positions],
+                                      [finishes[i] for i in positions],
+                                      positions)
+                        for c, positions in sorted(classes.items())]
+        self._runs = runs
+        # One (lo, hi) window per run of the occurrences of this index.
+        self._windows = tuple((0, len(run)) for run in runs)
+        # State shared by every index narrowed from this one: precomputed
+        # buckets (see ``precompute``).
+        self._shared = {'buckets': {}}
+
+    @classmethod
+    def coerce(cls, occurrences, overlap=False):
+        """Return ``occurrences`` if it already is an index, else index it."""
+        if isinstance(occurrences, cls):
+            return occurrences
+        return cls(occurrences or (), overlap=overlap)
+
+    def _narrow(self, windows, after=None):
+        index = self.__class__.__new__(self.__class__)
+        index.__dict__.update(self.__dict__)
+        index._windows = windows
+        if after is not None:
+            index.after = (after if self.after is None
+                           else max(self.after, after))
+        return index
+
+    def _window(self, run, window, start, finish):
+        lo, hi = window
+        if not self.overlap:
+            lo = bisect_left(run.starts, start, lo, hi)
+            return lo, bisect_right(run.starts, finish, lo, hi)
+        hi = bisect_right(run.starts, finish, lo, hi)
+        return bisect_right(run.reach, start, lo, hi), hi
+
+    def between(self, start, finish):
+        """The occurrences of this index starting within [start, finish], or
+        overlapping it in overlap mode."""
+        after = start if self.overlap else None
+        buckets = self._shared['buckets'].get((start, finish))
+        if buckets is not None:
+            windows = []
+            for (lo, hi), (parent_lo, parent_hi) in zip(buckets,
+                                                         self._windows):
+                lo = max(lo, parent_lo)
+                windows.append((lo, max(min(hi, parent_hi), lo)))
+            return self._narrow(tuple(windows), after)
+        return self._narrow(tuple(
+            self._window(run, window, start, finish)
+            for run, window in zip(self._runs, self._windows)
+        ), after)
+
+    def _bucket(self, boundaries):
+        """For each pair of consecutive ``boundaries``, the windows of its
+        occurrences in each run."""
+        per_run = [bucket_windows(run, lo, hi, self.overlap, boundaries)
+                   for run, (lo, hi) in zip(self._runs, self._windows)]
+        return zip(*per_run)
+
+    def precompute(self, boundaries):
+        """
+        Bucket this index's occurrences between each pair of consecutive
+        ``boundaries`` (a sorted list of datetimes) in one go, so that later
+        calls to ``between(boundaries[i], boundaries[i + 1] - resolution)``
+        on this index, or any index derived from the same one, are
+        dictionary lookups. Returns whether each bucket has occurrences.
+        """
+        buckets = self._shared['buckets']
+        occupied = []
+        for i, windows in enumerate(self._bucket(boundaries)):
+            buckets[(boundaries[i],
+                     boundaries[i + 1] - timedelta.resolution)] = windows
+            occupied.append(any(lo < hi for lo, hi in windows))
+        return occupied
+
+    def occupied(self, boundaries):
+        """Whether each bucket between consecutive ``boundaries`` has
+        occurrences, like ``precompute`` but without keeping the buckets."""
+        return [any(lo < hi for lo, hi in windows)
+                for windows in self._bucket(boundaries)]
+
+    def _run_positions(self, run, window):
+        """The positions, in ``_items``, of this index's occurrences in
+        ``run``."""
+        lo, hi = window
+        if self.after is None:
+            positions = range(lo, hi)
+        else:
+            finishes, after = run.finishes, self.after
+            positions = [i for i in xrange(lo, hi) if finishes[i] > after]
+        if run.positions is None:
+            return positions
+        run_positions = run.positions
+        return [run_positions[i] for i in positions]
+
+    def _positions(self):
+        positions = [p for p in (self._run_positions(run, window) for
+                                 run, window in zip(self._runs, self._windows))
+                     if p]
+        if len(positions) == 1:
+            return positions[0]
+        # Several runs: back to start order.
+        return sorted(i for p in positions for i in p)
+
+    def items(self):
+        if self.after is None and len(self._runs) == 1:
+            lo, hi = self._windows[0]
+            return self._items[lo:hi]
+        items = self._items
+        return [items[i] for i in self._positions()]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __len__(self):
+        if self.after is None:
+            return sum(hi - lo for lo, hi in self._windows)
+        return len(self._positions())
+
+    def __nonzero__(self):
+        after = self.after
+        for run, (lo, hi) in zip(self._runs, self._windows):
+            if lo < hi and (after is None or
+                            any(f > after for f in run.finishes[lo:hi])):
+                return True
+        return False
+
+    def __getitem__(self, key):
+        return self.items()[key]
+
+    def __repr__(self):
+        return '<%s: %d occurrences>' % (self.__class__.__name__, len(self))
@@ -2,64 +2,274 @@ import calendar
 from datetime import datetime, timedelta
 
 from dateutil.relativedelta import relativedelta
-from dateutil.rrule import (
-    rrule, MONTHLY, WEEKLY, DAILY, HOURLY, MINUTELY
-)
 
 from django.utils import formats
 from django.utils.translation import ugettext_lazy as _
 from django.utils.dates import MONTHS, MONTHS_3, WEEKDAYS, WEEKDAYS_ABBR
 
-from calendartools.periods.proxybase import SimpleProxy
+from calendartools.periods.proxybase import DateTimeProxy
+from calendartools.periods.cache import (
+    LazySequence, PeriodCache, memoized_property, period_skeletons
+)
+from calendartools.periods.occurrences import (
+    OccurrenceIndex, start_key, finish_key
+)
+from calendartools.periods.stepping import add_interval, step_range
 from calendartools import defaults
-from calendartools.utils import make_datetime, standardise_first_dow
+from calendartools.utils import (
+    make_datetime, first_weekday, timedelta_to_total_seconds,
+    epoch_microseconds
+)
 
-__all__ = ['Period', 'Hour', 'Day', 'Week', 'Month', 'TripleMonth', 'Year',
-           'first_day_of_week']
+__all__ = ['Period', 'Hour', 'Day', 'DayInterval', 'Week', 'Month',
+           'TripleMonth', 'Year', 'first_day_of_week']
 
-# Sensible default:
-calendar.setfirstweekday(standardise_first_dow(
-    formats.get_format('FIRST_DAY_OF_WEEK')
-))
+_weekday_tables = {}
+_calendars = {}
 
 def get_weekday_properties():
-    dayabbrs = WEEKDAYS_ABBR.values() * 2
-    daynames = WEEKDAYS.values() * 2
-    weekday_names = []
-    weekday_abbrs = []
-    first_dow = standardise_first_dow(formats.get_format('FIRST_DAY_OF_WEEK'))
-
-    for i in range(first_dow, first_dow + 7):
-        weekday_names.append(daynames[i])
-        weekday_abbrs.append(dayabbrs[i])
-    return weekday_names, weekday_abbrs
+    """Weekday names and abbreviations, ordered from the active language's
+    first day of the week. The names are lazy translations, so the tables
+    only depend on that first day and are built once for each; they are
+    shared and must not be modified."""
+    first_dow = first_weekday()
+    try:
+        return _weekday_tables[first_dow]
+    except KeyError:
+        dayabbrs = WEEKDAYS_ABBR.values() * 2
+        daynames = WEEKDAYS.values() * 2
+        tables = (daynames[first_dow:first_dow + 7],
+                  dayabbrs[first_dow:first_dow + 7])
+        _weekday_tables[first_dow] = tables
+        return tables
+
+def get_calendar():
+    """A ``calendar.Calendar`` for the active language's first day of the
+    week, used instead of the module-global ``calendar.setfirstweekday``."""
+    first_dow = first_weekday()
+    try:
+        return _calendars[first_dow]
+    except KeyError:
+        cal = _calendars[first_dow] = calendar.Calendar(first_dow)
+        return cal
+
+_timeslot_templates = {}
+
+def get_timeslot_template():
+    """
+    The layout of the time slots of ``Day.intervals``: the offset of the
+    first slot from the start of the day, the slot length and the number of
+    slots, worked out once from ``TIMESLOT_START_TIME``, ``TIMESLOT_INTERVAL``
+    and ``TIMESLOT_END_TIME_DURATION``.
+    """
+    key = (defaults.TIMESLOT_START_TIME, defaults.TIMESLOT_INTERVAL,
+           defaults.TIMESLOT_END_TIME_DURATION)
+    try:
+        return _timeslot_templates[key]
+    except KeyError:
+        start_time, interval, duration = key
+        first_offset = timedelta(hours=start_time.hour,
+                                 minutes=start_time.minute)
+        count = (timedelta_to_total_seconds(duration) //
+                 timedelta_to_total_seconds(interval)) + 1
+        template = _timeslot_templates[key] = (first_offset, interval, count)
+        return template
+
+def aware_epoch(item):
+    """The UTC epoch microseconds of ``item`` if it is an aware datetime (or
+    a period), else ``None``."""
+    if isinstance(item, DateTimeProxy):
+        item = item._obj
+    if isinstance(item, datetime) and item.tzinfo is not None:
+        return epoch_microseconds(item)
+    return None
 
 def first_day_of_week(dt):
-    first_dow = standardise_first_dow(formats.get_format('FIRST_DAY_OF_WEEK'))
+    first_dow = first_weekday()
     tzinfo = dt.tzinfo if hasattr(dt, 'tzinfo') else None
     first_date = make_datetime(dt.year, dt.month, dt.day, tzinfo=tzinfo)
     return first_date + relativedelta(weekday=first_dow, days=-6)
 
 
-class Period(SimpleProxy):
+class Period(DateTimeProxy):
+    __slots__ = ('occurrence_index', '_skeleton', '_memo',
+                 '_period_cache')
     month_names = MONTHS.values()
     month_names_abbr = MONTHS_3.values()
     format = 'DATETIME_FORMAT'
+    # Whether ``interval`` is added in local wall-clock time (days and longer)
+    # or as elapsed time (hours and shorter); see ``add_interval``.
+    wall_clock = True
+    # Whether ``convert`` depends on the active language (see
+    # ``PeriodSkeletons``).
+    locale_dependent = False
+    # Whether a period built without a period cache starts one for itself
+    # and its children, so that e.g. the months of a tri-month period share
+    # the weeks on their boundaries.
+    shares_children = False
 
     def __init__(self, obj, *args, **kwargs):
-        self.day_names, self.day_names_abbr = get_weekday_properties()
-        self._real_obj = obj
-        obj = self.convert(obj)
-        occurrences = kwargs.pop('occurrences', [])
+        # A ``skeleton`` given by the caller is used as it is, without
+        # converting ``obj`` (see ``load_period``).
+        self._skeleton = (kwargs.pop('skeleton', None) or
+                          period_skeletons.get(self.__class__, obj))
+        obj = self._skeleton.start
+        self._memo = None
+        self._period_cache = kwargs.pop('period_cache', None)
+        occurrences = kwargs.pop('occurrences', None)
+        if occurrences is None:
+            occurrences = getattr(self._period_cache, 'occurrences', [])
+        overlap = kwargs.pop('overlap', False)
         super(Period, self).__init__(obj, *args, **kwargs)
-        self.occurrences = self.process_occurrences(occurrences)
+        index = OccurrenceIndex.coerce(occurrences, overlap=overlap)
+        if index:
+            index = index.between(self.start, self.finish)
+        self.occurrence_index = index
+        if self._period_cache is None and self.shares_children:
+            self._period_cache = PeriodCache(index)
+            self._period_cache.register(self)
 
     def __unicode__(self):
         return formats.date_format(self, self.format)
 
+    @memoized_property
+    def occurrences(self):
+        return self.occurrence_index.items()
+
+    @property
+    def _day_counts(self):
+        return getattr(self._period_cache, 'day_counts', None)
+
+    def _counted_days(self, counts):
+        first, last = self.start.date(), self.finish.date()
+        return ((day, count) for day, count in counts.iteritems()
+                if first <= day <= last)
+
+    @property
+    def occurrence_count(self):
+        """The number of occurrences in this period, added up from the
+        period cache's ``day_counts`` if the periods were built from those."""
+        counts = self._day_counts
+        if counts is None:
+            return len(self.occurrence_index)
+        return sum(count for day, count in self._counted_days(counts))
+
+    @property
+    def status_counts(self):
+        """The number of occurrences in this period of each status, if the
+        periods were built from per-status day counts, else ``None``."""
+        counts = getattr(self._period_cache, 'day_status_counts', None)
+        if counts is None:
+            return None
+        totals = {}
+        for day, statuses in self._counted_days(counts):
+            for status, count in statuses.iteritems():
+                totals[status] = totals.get(status, 0) + count
+        return totals
+
+    @property
+    def count(self):
+        """The number of occurrences in this period (``occurrence_count``)."""
+        return self.occurrence_count
+
+    @memoized_property
+    def _sweep(self):
+        """
+        The busy time and peak concurrency of this period's occurrences,
+        clipped to the period, from one sweep over their starts and
+        finishes in time order. An occurrence finishing as another starts
+        doesn't overlap it.
+        """
+        start, end = self.start, self.finish + timedelta.resolution
+        events = []
+        for o in self.occurrences:
+            o_start = max(start_key(o), start)
+            o_finish = min(finish_key(o) if o.finish else o_start, end)
+            if o_finish > o_start:
+                events.append((o_start, 1))
+                events.append((o_finish, -1))
+        # Finishes sort before starts at the same time.
+        events.sort()
+        busy, active, peak, busy_since = timedelta(0), 0, 0, None
+        for dt, change in events:
+            if change > 0 and not active:
+                busy_since = dt
+            active += change
+            if not active:
+                busy += dt - busy_since
+            peak = max(peak, active)
+        return busy, peak
+
+    @property
+    def busy_duration(self):
+        """How long, as a ``timedelta``, at least one occurrence is in
+        progress during this period."""
+        return self._sweep[0]
+
+    @property
+    def max_concurrency(self):
+        """The largest number of occurrences in progress at once during
+        this period."""
+        return self._sweep[1]
+
+    @property
+    def utilisation(self):
+        """The fraction of this period that is busy, from 0 to 1."""
+        length = timedelta_to_total_seconds(
+            self.finish + timedelta.resolution - self.start
+        )
+        return timedelta_to_total_seconds(self.busy_duration) / float(length)
+
+    @property
+    def is_busy(self):
+        if self._day_counts is not None:
+            return self.occurrence_count > 0
+        return bool(self.occurrence_index)
+
+    @memoized_property
+    def busy_bitmap(self):
+        """An int with one bit per day of this period, the lowest for its
+        first day, set for the days that have occurrences. The days are
+        bucketed all at once, without building a ``Day`` for each."""
+        bitmap = 0
+        counts = self._day_counts
+        if counts is not None:
+            first = self.start.date()
+            for day, count in self._counted_days(counts):
+                if count:
+                    bitmap |= 1 << (day - first).days
+        elif self.occurrence_index:
+            occupied = self.occurrence_index.occupied(
+                Day.boundaries(self.start, self.finish)
+            )
+            for i, busy in enumerate(occupied):
+                if busy:
+                    bitmap |= 1 << i
+        return bitmap
+
+    def is_busy_on(self, dt):
+        """Whether the (local) day of ``dt``, within this period, has
+        occurrences; see ``busy_bitmap``."""
+        offset = (dt.date() - self.start.date()).days
+        return offset >= 0 and bool(self.busy_bitmap >> offset & 1)
+
+    @property
+    def day_names(self):
+        return get_weekday_properties()[0]
+
+    @property
+    def day_names_abbr(self):
+        return get_weekday_properties()[1]
+
     def process_occurrences(self, occurrences, key=None):
+        """Filter ``occurrences`` down to those whose ``key`` (their start by
+        default) falls within this period. Periods index their occurrences
+        once on construction - see ``OccurrenceIndex`` - so this linear scan
+        is only needed for ad-hoc filtering with a custom ``key``."""
         if not key:
-            key = lambda o: o.start
+            return OccurrenceIndex.coerce(occurrences).between(
+                self.start, self.finish
+            ).items()
         return [o for o in occurrences if key(o) in self]
 
     def convert(self, dt):
@@ -74,18 +284,59 @@ class Period(SimpleProxy):
     def interval(self):
         raise NotImplementedError
 
+    @property
+    def epoch_bounds(self):
+        """This period's start and finish as UTC epoch microseconds."""
+        skeleton = self._skeleton
+        if skeleton.epochs is None:
+            skeleton.epochs = (epoch_microseconds(self.start),
+                               epoch_microseconds(self.finish))
+        return skeleton.epochs
+
     def __contains__(self, item):
         """Note that when comparing datetime.date objects with this class, they
         will automatically be coerced to datetime objects with a default start
-        time of 12:00:00 am, which might mean they are included as members."""
+        time of 12:00:00 am, which might mean they are included as members.
+
+        Aware datetimes (and periods) are compared as instants, with integer
+        comparisons against ``epoch_bounds``."""
+        epoch = aware_epoch(item)
+        if epoch is not None:
+            start, finish = self.epoch_bounds
+            return start <= epoch <= finish
+
         try:
-            item = self.convert(item)
+            item = self._convert_member(item)
         except AttributeError:
             return False
 
         return self.start <= item <= self.finish
 
+    def _convert_member(self, item):
+        """Coerce a naive ``item`` for ``__contains__``."""
+        return self.convert(item)
+
+    def _identity(self):
+        """What tells periods apart: their start, class and time zone (as
+        for ``PeriodSkeletons``), in the order periods are sorted by."""
+        tzinfo = self.start.tzinfo
+        return (self.start, self.__class__.__name__,
+                getattr(tzinfo, 'zone', tzinfo), self.__class__)
+
     def __cmp__(self, other):
+        """Periods are equal to the periods of the same class, start and
+        time zone, and sorted by start. Aware datetimes compare equal to the
+        periods they are in, and greater or less than the others."""
+        if isinstance(other, Period):
+            return cmp(self._identity(), other._identity())
+        epoch = aware_epoch(other)
+        # (The abstract Period's interval is a method: it has no finish.)
+        if epoch is not None and not callable(self.interval):
+            start, finish = self.epoch_bounds
+            if epoch < start:
+                return 1
+            return 0 if epoch <= finish else -1
+
         try:
             other = self.convert(other)
         except AttributeError:
@@ -93,6 +344,13 @@ class Period(SimpleProxy):
 
         return cmp(self.start, other)
 
+    def __hash__(self):
+        # Consistent with ``__cmp__`` between periods. Datetimes comparing
+        # equal to a period (being inside it) aren't found under it in a
+        # dict or set: no hash could agree with that equality, which isn't
+        # transitive.
+        return hash(self._identity())
+
     def previous(self):
         return self.__class__(self._obj - self.interval)
 
@@ -105,40 +363,122 @@ class Period(SimpleProxy):
 
     @property
     def finish(self):
-        return (self.start + self.interval) - timedelta.resolution
+        skeleton = self._skeleton
+        if skeleton.finish is None:
+            skeleton.finish = add_interval(
+                self.start, self.interval, wall_clock=self.wall_clock
+            ) - timedelta.resolution
+        return skeleton.finish
+
+    def _get_period(self, period_class, dt, cached=True):
+        """Build a related (child or parent) period of this one, through the
+        period cache if there is one."""
+        if cached and self._period_cache is not None:
+            return self._period_cache.get(period_class, dt)
+        return period_class(dt, occurrences=self.occurrence_index,
+                            period_cache=self._period_cache)
+
+    @classmethod
+    def start_of(cls, dt):
+        """The start of the period of this class containing ``dt``, without
+        building the period."""
+        return cls.convert(cls.__new__(cls), dt)
+
+    @classmethod
+    def boundaries(cls, start, finish):
+        """The starts of the consecutive periods of this class covering
+        [start, finish], followed by the start of the period after them."""
+        first = cls.start_of(start)
+        bounds = list(step_range(first, finish, cls.interval, cls.wall_clock))
+        bounds.append(add_interval(first, cls.interval, len(bounds),
+                                   cls.wall_clock))
+        return bounds
+
+    def _inner_boundaries(self, period_class):
+        """``period_class.boundaries`` over this period, leaving out the
+        periods that start before or finish after it (such as the weeks on
+        the edges of a month): only part of their occurrences are here."""
+        bounds = period_class.boundaries(self.start, self.finish)
+        if bounds[0] < self.start:
+            bounds = bounds[1:]
+        if bounds and bounds[-1] > self.finish + timedelta.resolution:
+            bounds = bounds[:-1]
+        return bounds
+
+    def precompute(self, *period_classes):
+        """Bucket this period's occurrences into all of its child periods of
+        the given classes at once (see ``OccurrenceIndex.precompute``)."""
+        if self.occurrence_index:
+            for period_class in period_classes:
+                self.occurrence_index.precompute(
+                    self._inner_boundaries(period_class)
+                )
+
+    def non_empty(self, period_class):
+        """The child periods of ``period_class`` within this period that have
+        occurrences, found in one pass and without building the empty
+        ones."""
+        index = self.occurrence_index
+        if not index:
+            return []
+        bounds = self._inner_boundaries(period_class)
+        return [self._get_period(period_class, bounds[i])
+                for i, busy in enumerate(index.precompute(bounds))
+                if busy]
+
+    def step(self, interval, wall_clock=True):
+        """Iterate over this period's start and each following ``interval``
+        up to its finish."""
+        return step_range(self.start, self.finish, interval, wall_clock)
 
 
 class Hour(Period):
+    __slots__ = ()
     interval = relativedelta(hours=+1)
-    convert = lambda self, dt: make_datetime(dt.year, dt.month, dt.day, dt.hour,
-                                             tzinfo=dt.tzinfo)
+    wall_clock = False
     period_name = _('hour')
     period_adverb = _('hourly')
     format = 'TIME_FORMAT'
 
     def __iter__(self):
-        return (dt for dt in rrule(
-            MINUTELY, dtstart=self.start, until=self.finish)
-        )
+        return iter(self.minutes)
+
+    @memoized_property
+    def minutes(self):
+        """The start of each minute of this hour, worked out when used."""
+        minute = relativedelta(minutes=+1)
+        return LazySequence(60, lambda i: add_interval(
+            self.start, minute, i, wall_clock=False
+        ))
+
+    def convert(self, dt):
+        if isinstance(dt, datetime) and dt.tzinfo is not None:
+            # Truncate the aware datetime itself: re-localizing its
+            # wall-clock time would be ambiguous in the hour repeated when
+            # the clocks go back.
+            return dt.replace(minute=0, second=0, microsecond=0)
+        return make_datetime(dt.year, dt.month, dt.day, dt.hour,
+                             tzinfo=dt.tzinfo)
 
     @property
     def number(self):
         return self.hour
 
     def get_day(self):
-        return Day(self, occurrences=self.occurrences)
+        return self._get_period(Day, self)
 
     def get_week(self):
-        return Week(self, occurrences=self.occurrences)
+        return self._get_period(Week, self)
 
     def get_month(self):
-        return Month(self, occurrences=self.occurrences)
+        return self._get_period(Month, self)
 
     def get_year(self):
-        return Year(self, occurrences=self.occurrences)
+        return self._get_period(Year, self)
 
 
 class Day(Period):
+    __slots__ = ()
     interval = relativedelta(days=+1)
     period_name = _('day')
     period_adverb = _('daily')
@@ -164,51 +504,81 @@ class Day(Period):
         return self.day
 
     @property
+    def is_busy(self):
+        """Whether this day has occurrences, read from its month's
+        ``busy_bitmap`` when the day was built through a period cache: the
+        small calendars only need this, not the occurrences themselves."""
+        if self._period_cache is None:
+            return bool(self.occurrence_index)
+        return self.get_month().is_busy_on(self)
+
+    @property
+    def occurrence_count(self):
+        counts = self._day_counts
+        if counts is None:
+            return len(self.occurrence_index)
+        return counts.get(self.date(), 0)
+
+    @memoized_property
     def hours(self):
-        return [Hour(dt, occurrences=self.occurrences) for dt in
-                rrule(HOURLY, dtstart=self.start, until=self.finish)]
+        """The hours of this day, each built when first used."""
+        starts = list(self.step(Hour.interval, wall_clock=False))
+        return LazySequence(
+            len(starts), lambda i: self._get_period(Hour, starts[i])
+        )
 
     def get_week(self):
-        return Week(self, occurrences=self.occurrences)
+        return self._get_period(Week, self)
 
     def get_month(self):
-        return Month(self, occurrences=self.occurrences)
+        return self._get_period(Month, self)
 
     def get_year(self):
-        return Year(self, occurrences=self.occurrences)
+        return self._get_period(Year, self)
 
 
-    @property
+    @memoized_property
     def intervals(self):
-        class DayInterval(Period):
-            interval = defaults.TIMESLOT_INTERVAL
+        first_offset, interval, count = get_timeslot_template()
+        first = add_interval(self.start, first_offset)
+        starts = [add_interval(first, interval, i, wall_clock=False)
+                  for i in range(count + 1)]
+        # Assign the day's occurrences to all of its slots in one pass.
+        if self.occurrence_index:
+            self.occurrence_index.precompute(starts)
+        return [self._get_period(DayInterval, dt, cached=False)
+                for dt in starts[:-1]]
+
+
+class DayInterval(Period):
+    """A time slot of a ``Day``, as laid out in ``Day.intervals``."""
+    __slots__ = ()
+    interval = defaults.TIMESLOT_INTERVAL
+    wall_clock = False
 
-            def get_day(self):
-                return Day(self, occurrences=self.occurrences)
+    def convert(self, dt):
+        if isinstance(dt, datetime) and dt.tzinfo is not None:
+            return dt.replace(microsecond=0)
+        return super(DayInterval, self).convert(dt)
 
-            def get_week(self):
-                return Week(self, occurrences=self.occurrences)
+    def get_day(self):
+        return self._get_period(Day, self)
 
-            def get_month(self):
-                return Month(self, occurrences=self.occurrences)
+    def get_week(self):
+        return self._get_period(Week, self)
 
-            def get_year(self):
-                return Year(self, occurrences=self.occurrences)
+    def get_month(self):
+        return self._get_period(Month, self)
 
-        intervals = []
-        start_time = defaults.TIMESLOT_START_TIME
-        start = self.start.replace(hour=start_time.hour,
-                                   minute=start_time.minute)
-        finish = start + defaults.TIMESLOT_END_TIME_DURATION
-        while start <= finish:
-            intervals.append(DayInterval(start, occurrences=self.occurrences))
-            start += defaults.TIMESLOT_INTERVAL
-        return intervals
+    def get_year(self):
+        return self._get_period(Year, self)
 
 
 class Week(Period):
+    __slots__ = ()
     interval = relativedelta(weeks=+1)
     convert = lambda self, dt: first_day_of_week(dt)
+    locale_dependent = True
     period_name = _('week')
     period_adverb = _('weekly')
     format = 'DATE_FORMAT'
@@ -216,48 +586,43 @@ class Week(Period):
     def __iter__(self):
         return iter(self.days)
 
-    def __contains__(self, item):
-        """ Check if ``item`` is in this week's range but instead of coercing
-        ``item`` using ``Week.convert``, use ``Period.convert``. This is to
+    def _convert_member(self, item):
+        """ Check if ``item`` is in this week's range without coercing it
+        using ``Week.convert``: use ``Period.convert`` instead. This is to
         avoid "incorrect" starts of the week because of timezone
         differences. """
-        try:
-            item = super(Week, self).convert(item)
-        except AttributeError:
-            return False
-
-        return self.start <= item <= self.finish
+        return super(Week, self).convert(item)
 
     @property
     def number(self):
         return ((self - make_datetime(self.year, 1, 1)).days / 7) + 1
 
-    @property
+    @memoized_property
     def days(self):
-        return [Day(dt, occurrences=self.occurrences) for dt in rrule(DAILY,
-            dtstart=self.start, until=self.finish
-        )]
+        return [self._get_period(Day, dt) for dt in
+                self.step(Day.interval)]
 
     def get_month(self):
-        return Month(self, occurrences=self.occurrences)
+        return self._get_period(Month, self)
 
     def get_year(self):
-        return Year(self, occurrences=self.occurrences)
+        return self._get_period(Year, self)
 
     @property
     def first_day(self):
-        return Day(self.start, occurrences=self.occurrences)
+        return self._get_period(Day, self.start)
 
     @property
     def last_day(self):
-        return Day(self.finish, occurrences=self.occurrences)
+        return self._get_period(Day, self.finish)
 
-    @property
+    @memoized_property
     def calendar_display(self):
         return zip(*[d.intervals for d in self])
 
 
 class Month(Period):
+    __slots__ = ()
     interval = relativedelta(months=+1)
     period_name = _('month')
     period_adverb = _('monthly')
@@ -282,14 +647,13 @@ class Month(Period):
     def number(self):
         return self.month
 
-    @property
+    @memoized_property
     def weeks(self):
-        weeks = [Week(dt, occurrences=self.occurrences) for dt in rrule(WEEKLY,
-            dtstart=self.start, until=self.finish
-        )]
+        weeks = [self._get_period(Week, dt) for dt in
+                 self.step(Week.interval)]
         following_week_start = weeks[-1].finish + timedelta.resolution
         if following_week_start in self:
-            weeks.append(Week(following_week_start, occurrences=self.occurrences))
+            weeks.append(self._get_period(Week, following_week_start))
         return weeks
         """
         res = []
@@ -300,57 +664,59 @@ class Month(Period):
         return res
         """
 
-    @property
+    @memoized_property
     def days(self):
-        return [Day(dt, occurrences=self.occurrences) for dt in rrule(DAILY,
-            dtstart=self.start, until=self.finish
-        )]
+        return [self._get_period(Day, dt) for dt in
+                self.step(Day.interval)]
 
-    @property
+    @memoized_property
     def calendar_display(self):
-        cal = calendar.monthcalendar(self.year, self.month)
-        return ((Day(make_datetime(self.year, self.month, num),
-                     occurrences=self.occurrences) if num else 0
-                     for num in lst) for lst in cal)
+        cal = get_calendar().monthdayscalendar(self.year, self.month)
+        return [[self._get_period(Day, make_datetime(self.year, self.month,
+                                                      num)) if num else 0
+                 for num in lst] for lst in cal]
 
     def get_year(self):
-        return Year(self, occurrences=self.occurrences)
+        return self._get_period(Year, self)
 
 
 class TripleMonth(Month):
+    __slots__ = ()
     interval = relativedelta(months=+3)
     period_name = _('triple month')
     period_adverb = _('tri-monthly')
 
+    shares_children = True
+
     def __iter__(self):
         return iter(self.months)
 
     @property
     def first_month(self):
-        return Month(self.start, occurrences=self.occurrences)
+        return self.months[0]
 
     @property
     def second_month(self):
-        return Month(self.start + relativedelta(months=+1),
-                     occurrences=self.occurrences)
+        return self.months[1]
 
     @property
     def third_month(self):
-        return Month(self.start + relativedelta(months=+2),
-                     occurrences=self.occurrences)
+        return self.months[2]
 
-    @property
+    @memoized_property
     def months(self):
-        return [Month(dt, occurrences=self.occurrences) for dt in
-                rrule(MONTHLY, dtstart=self.start, until=self.finish
-        )]
+        self.precompute(Month, Week, Day)
+        return [self._get_period(Month, dt) for dt in
+                self.step(Month.interval)]
 
 
 class Year(Period):
+    __slots__ = ()
     interval = relativedelta(years=+1)
     period_name = _('year')
     period_adverb = _('yearly')
     format = 'DATE_FORMAT'
+    shares_children = True
 
     def __iter__(self):
         return iter(self.months)
@@ -363,14 +729,13 @@ class Year(Period):
     def number(self):
         return self.year
 
-    @property
+    @memoized_property
     def months(self):
-        return [Month(dt, occurrences=self.occurrences) for dt in
-                rrule(MONTHLY, dtstart=self.start, until=self.finish
-        )]
+        self.precompute(Month, Week, Day)
+        return [self._get_period(Month, dt) for dt in
+                self.step(Month.interval)]
 
     @property
     def days(self):
-        for month in self.months:
-            for dt in rrule(DAILY, dtstart=month.start, until=month.finish):
-                yield Day(dt, occurrences=self.occurrences)
+        for dt in self.step(Day.interval):
+            yield self._get_period(Day, dt)
@@ -1,3 +1,8 @@
+from operator import attrgetter
+
+__all__ = ['SimpleProxy', 'DateTimeProxy']
+
+
 class SimpleProxy(object):
     def __init__(self, obj, *args, **kwargs):
         self._obj = obj
@@ -34,3 +39,72 @@ class SimpleProxy(object):
                     self._obj, self, attr
                 )
                 raise AttributeError, e
+
+
+class DateTimeProxy(object):
+    """
+    A compact proxy for a ``datetime``.
+
+    Unlike ``SimpleProxy``, instances have no ``__dict__`` and the datetime's
+    fields are exposed as class-level properties, so ``proxy.year`` is a
+    plain attribute lookup rather than a trip through ``__getattr__``. Only
+    the less common datetime attributes fall back to ``__getattr__``.
+    Subclasses should declare ``__slots__`` too.
+    """
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj, *args, **kwargs):
+        self._obj = obj
+
+    def __cmp__(self, other):
+        return cmp(self._obj, other)
+
+    def __add__(self, other):
+        return self._obj + other
+
+    def __sub__(self, other):
+        return self._obj - other
+
+    def __unicode__(self):
+        return unicode(self._obj)
+
+    def __repr__(self):
+        try:
+            u = unicode(self)
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            u = '[Bad Unicode data]'
+        return (u'<%s: %s>' % (self.__class__.__name__, u)).encode('utf8')
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            # Unset slots and private names are never proxied.
+            raise AttributeError(attr)
+        try:
+            return getattr(self._obj, attr)
+        except AttributeError:
+            raise AttributeError(
+                "%r and its Proxy(%r) have no '%s' attributes." % (
+                    self._obj, self, attr
+                )
+            )
+
+    year = property(attrgetter('_obj.year'))
+    month = property(attrgetter('_obj.month'))
+    day = property(attrgetter('_obj.day'))
+    hour = property(attrgetter('_obj.hour'))
+    minute = property(attrgetter('_obj.minute'))
+    second = property(attrgetter('_obj.second'))
+    microsecond = property(attrgetter('_obj.microsecond'))
+    tzinfo = property(attrgetter('_obj.tzinfo'))
+
+    # Bound methods of the proxied datetime, used by date formatting.
+    weekday = property(attrgetter('_obj.weekday'))
+    isoweekday = property(attrgetter('_obj.isoweekday'))
+    isocalendar = property(attrgetter('_obj.isocalendar'))
+    timetuple = property(attrgetter('_obj.timetuple'))
+    utcoffset = property(attrgetter('_obj.utcoffset'))
+    tzname = property(attrgetter('_obj.tzname'))
+    dst = property(attrgetter('_obj.dst'))
+    date = property(attrgetter('_obj.date'))
+    time = property(attrgetter('_obj.time'))
+    strftime = property(attrgetter('_obj.strftime'))
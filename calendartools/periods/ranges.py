@@ -0,0 +1,197 @@
+from calendartools.periods.occurrences import (
+    OccurrenceIndex, start_key, finish_key
+)
+from calendartools.periods.stepping import add_interval
+
+__all__ = ['PeriodRange', 'SlidingWindow']
+
+
+class PeriodRange(object):
+    """
+    The consecutive periods of class ``unit`` (``Day``, ``Week``, ``Month``
+    ...) from the one containing ``start`` to the one containing ``end``,
+    built one at a time as they are iterated over.
+
+    Each period gets the slice of ``occurrences`` belonging to it, taken
+    from a single pass over them in start order: a queryset is narrowed to
+    the range, ordered by ``start`` and read with ``iterator()``, and any
+    other iterable must already be sorted by start. Only the occurrences of the current period
+    (and in overlap mode, those still in progress) are held in memory, so
+    spans of several years can be walked for exports and reports without
+    building their parents or loading every occurrence at once.
+    """
+
+    def __init__(self, start, end, unit, occurrences=(), overlap=False):
+        self.start = start
+        self.end = end
+        self.unit = unit
+        self.occurrences = occurrences
+        self.overlap = overlap
+
+    def _bounds(self):
+        """The starts of the first and last periods."""
+        unit = self.unit
+        return unit.start_of(self.start), unit.start_of(self.end)
+
+    def _cursor(self):
+        occurrences = self.occurrences
+        if hasattr(occurrences, 'iterator'):
+            # Only read the rows of the range's periods.
+            first, last = self._bounds()
+            occurrences = occurrences.filter(
+                start__lte=self.unit(last).finish
+            )
+            if self.overlap:
+                occurrences = occurrences.filter(finish__gt=first)
+            else:
+                occurrences = occurrences.filter(start__gte=first)
+            occurrences = occurrences.order_by('start').iterator()
+        return iter(occurrences or ())
+
+    def _starts(self):
+        unit = self.unit
+        first, last = self._bounds()
+        count, dt = 0, first
+        while dt <= last:
+            count += 1
+            following = add_interval(first, unit.interval, count,
+                                     unit.wall_clock)
+            yield dt, following
+            dt = following
+
+    def __iter__(self):
+        cursor = self._cursor()
+        pending = next(cursor, None)
+        # In overlap mode, occurrences carried over from earlier periods
+        # because they have not finished yet.
+        carried = []
+        for period_start, following in self._starts():
+            if self.overlap:
+                members = [o for o in carried
+                           if finish_key(o) > period_start]
+            else:
+                members = []
+            while pending is not None and start_key(pending) < following:
+                if (start_key(pending) >= period_start or self.overlap and
+                        finish_key(pending) > period_start):
+                    members.append(pending)
+                pending = next(cursor, None)
+            if self.overlap:
+                carried = [o for o in members if finish_key(o) > following]
+            yield self.unit(period_start, occurrences=members,
+                            overlap=self.overlap)
+
+
+def _fetcher(occurrences, overlap):
+    """A function returning the occurrences in [start, finish] (or in
+    overlap mode, overlapping it) from a queryset, a sorted-or-not sequence
+    of occurrences, or such a function itself."""
+    if occurrences is None:
+        return lambda start, finish: ()
+    if hasattr(occurrences, 'filter'):
+        if overlap:
+            return lambda start, finish: occurrences.filter(
+                start__lte=finish, finish__gt=start
+            )
+        return lambda start, finish: occurrences.filter(
+            start__range=(start, finish)
+        )
+    if callable(occurrences):
+        return occurrences
+    index = OccurrenceIndex.coerce(occurrences, overlap=overlap)
+    return lambda start, finish: index.between(start, finish).items()
+
+
+class SlidingWindow(object):
+    """
+    A run of ``size`` consecutive periods of class ``unit`` starting with
+    the one containing ``start`` - the next 7 days, the next 4 weeks - that
+    can be moved along one period at a time.
+
+    ``occurrences`` may be a queryset, a list of occurrences or a function
+    ``fetch(start, finish)`` returning the occurrences of that span. The
+    window loads them for its whole span once; moving it with ``next``,
+    ``previous`` or ``shift`` keeps the periods still in view, with their
+    occurrences, and only fetches and indexes the newly exposed ones.
+    """
+
+    def __init__(self, start, unit, size, occurrences=None, overlap=False):
+        self.unit = unit
+        self.size = size
+        self.overlap = overlap
+        self._fetch = _fetcher(occurrences, overlap)
+        first = unit.start_of(start)
+        self.periods = self._load(first, size)
+
+    def _load(self, first, count):
+        """Build ``count`` periods from the one starting at ``first``, with
+        one fetch for all of them."""
+        unit = self.unit
+        starts = [add_interval(first, unit.interval, i, unit.wall_clock)
+                  for i in range(count)]
+        finish = unit(starts[-1]).finish
+        index = OccurrenceIndex(self._fetch(starts[0], finish),
+                                overlap=self.overlap)
+        return [unit(dt, occurrences=index) for dt in starts]
+
+    def shift(self, steps=1):
+        """Return this window moved ``steps`` periods on (or back, if
+        negative), sharing the periods both windows show."""
+        window = self.__class__.__new__(self.__class__)
+        window.__dict__.update(self.__dict__)
+        unit, periods = self.unit, self.periods
+        first = add_interval(periods[0].start, unit.interval, steps,
+                             unit.wall_clock)
+        if abs(steps) >= self.size:
+            window.periods = self._load(first, self.size)
+        elif steps > 0:
+            following = add_interval(periods[-1].start, unit.interval, 1,
+                                     unit.wall_clock)
+            window.periods = periods[steps:] + self._load(following, steps)
+        elif steps < 0:
+            window.periods = self._load(first, -steps) + periods[:steps]
+        return window
+
+    def next(self):
+        return self.shift(1)
+
+    def previous(self):
+        return self.shift(-1)
+
+    @property
+    def start(self):
+        return self.periods[0].start
+
+    @property
+    def finish(self):
+        return self.periods[-1].finish
+
+    @property
+    def occurrences(self):
+        if not self.overlap:
+            return [o for period in self.periods for o in period.occurrences]
+        # Occurrences overlapping several periods are only listed once.
+        seen, occurrences = set(), []
+        for period in self.periods:
+            for o in period.occurrences:
+                key = getattr(o, 'pk', None) or id(o)
+                if key not in seen:
+                    seen.add(key)
+                    occurrences.append(o)
+        return occurrences
+
+    def __iter__(self):
+        return iter(self.periods)
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __getitem__(self, key):
+        return self.periods[key]
+
+    def __contains__(self, item):
+        return any(item in period for period in self.periods)
+
+    def __repr__(self):
+        return '<%s: %s - %s>' % (self.__class__.__name__, self.start,
+                                  self.finish)
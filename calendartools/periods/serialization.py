@@ -0,0 +1,138 @@
+"""
+A compact, picklable form of a period and its occurrences.
+
+Built periods can't be cached as they are: they proxy datetimes, refer to
+lazy translations and hold model instances. ``dump_period`` reduces one to
+plain tuples of ints and strings - its boundaries as epoch microseconds
+and each occurrence as an ``(id, start, finish, status, event name, event
+slug, url)`` tuple - which Django's cache stores cheaply. ``load_period``
+rebuilds the period with the stored boundaries, whose children are then
+built from the stored occurrences as usual, without touching the ORM.
+"""
+from datetime import timedelta
+
+import pytz
+
+from django.db.models.loading import get_model
+
+from calendartools import defaults
+from calendartools.periods import periods
+from calendartools.periods.cache import PeriodCache, PeriodSkeleton
+from calendartools.periods.occurrences import start_key, finish_key
+from calendartools.utils import EPOCH, epoch_microseconds
+
+__all__ = ['CachedOccurrence', 'dump_period', 'load_period']
+
+FORMAT_VERSION = 1
+
+def _from_epoch(microseconds, tzinfo):
+    return (EPOCH + timedelta(microseconds=microseconds)).astimezone(tzinfo)
+
+
+class CachedEvent(object):
+    __slots__ = ('name', 'slug')
+
+    def __init__(self, name, slug):
+        self.name = name
+        self.slug = slug
+
+    def __unicode__(self):
+        return self.name or u''
+
+
+class CachedOccurrence(object):
+    """
+    A stand-in for an ``Occurrence`` rebuilt by ``load_period``, with the
+    attributes the calendar templates use. The event's description isn't
+    kept.
+    """
+    __slots__ = ('id', 'start', 'finish', 'status', 'event', 'url')
+
+    def __init__(self, id, start, finish, status, event_name, event_slug,
+                 url):
+        self.id = id
+        self.start = start
+        self.finish = finish
+        self.status = status
+        self.event = CachedEvent(event_name, event_slug)
+        self.url = url
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def status_slug(self):
+        return self.status
+
+    def get_status_display(self):
+        Occurrence = get_model(defaults.CALENDAR_APP_LABEL, 'Occurrence')
+        choices = dict(Occurrence._meta.get_field('status').flatchoices)
+        return choices.get(self.status, self.status)
+
+    def get_absolute_url(self):
+        return self.url
+
+    def __repr__(self):
+        return '<CachedOccurrence: %s>' % self.start
+
+
+def _dump_occurrence(o):
+    event = getattr(o, 'event', None)
+    get_absolute_url = getattr(o, 'get_absolute_url', None)
+    return (
+        getattr(o, 'pk', None),
+        epoch_microseconds(start_key(o)),
+        epoch_microseconds(finish_key(o)) if o.finish else None,
+        getattr(o, 'status', None),
+        getattr(event, 'name', None),
+        getattr(event, 'slug', None),
+        get_absolute_url() if get_absolute_url else None,
+    )
+
+def dump_period(period):
+    """Return the compact form of ``period`` and its occurrences. The
+    period's start must be in a pytz time zone."""
+    zone = getattr(period.start.tzinfo, 'zone', None)
+    if zone is None:
+        raise ValueError('Periods can only be dumped with a pytz time zone, '
+                         'not %r' % period.start.tzinfo)
+    return (
+        FORMAT_VERSION,
+        period.__class__.__name__,
+        epoch_microseconds(period.start),
+        epoch_microseconds(period.finish),
+        zone,
+        period.occurrence_index.overlap,
+        tuple(_dump_occurrence(o) for o in period.occurrences),
+    )
+
+def load_period(data):
+    """
+    Rebuild a period from ``dump_period``'s output, with ``CachedOccurrence``
+    instances for occurrences. The period keeps its stored start and finish,
+    whatever the active language's first day of the week, and is registered
+    in a new ``PeriodCache``, so its children share the stored occurrences.
+    """
+    version, class_name, start, finish, zone, overlap, occurrences = data
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported period format version: %r' % version)
+    period_class = getattr(periods, class_name, None)
+    if not (isinstance(period_class, type) and
+            issubclass(period_class, periods.Period)):
+        raise ValueError('Not a period class: %r' % class_name)
+    tzinfo = pytz.timezone(zone)
+    period_cache = PeriodCache([
+        CachedOccurrence(pk, _from_epoch(o_start, tzinfo),
+                         _from_epoch(o_finish, tzinfo)
+                         if o_finish is not None else None,
+                         status, name, slug, url)
+        for pk, o_start, o_finish, status, name, slug, url in occurrences
+    ], overlap=overlap)
+    skeleton = PeriodSkeleton(_from_epoch(start, tzinfo))
+    skeleton.finish = _from_epoch(finish, tzinfo)
+    skeleton.epochs = (start, finish)
+    period = period_class(skeleton.start, skeleton=skeleton,
+                          period_cache=period_cache)
+    period_cache.register(period)
+    return period
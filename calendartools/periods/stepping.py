@@ -0,0 +1,41 @@
+from calendartools.utils import make_datetime
+
+__all__ = ['add_interval', 'step_range']
+
+def add_interval(dt, interval, count=1, wall_clock=True):
+    """
+    Return ``dt`` moved on by ``count`` times ``interval``.
+
+    With ``wall_clock`` (the default, right for days and longer) the interval
+    is added to the local wall-clock time, which is then localized again in
+    ``dt``'s time zone, so that e.g. adding a day to midnight gives the next
+    midnight even across a DST change. Otherwise the interval is elapsed
+    time - right for hours and shorter - and the result is normalized into
+    the correct UTC offset of ``dt``'s time zone.
+    """
+    tzinfo = dt.tzinfo
+    if tzinfo is None:
+        return dt + interval * count
+    if wall_clock:
+        naive = dt.replace(tzinfo=None) + interval * count
+        return make_datetime(naive.year, naive.month, naive.day, naive.hour,
+                             naive.minute, naive.second, naive.microsecond,
+                             tzinfo=tzinfo)
+    dt = dt + interval * count
+    if hasattr(tzinfo, 'normalize'):
+        # available for pytz time zones
+        dt = tzinfo.normalize(dt)
+    return dt
+
+def step_range(start, finish, interval, wall_clock=True):
+    """
+    Yield ``start`` and every following step of ``interval`` up to and
+    including ``finish``. A plain date-arithmetic replacement for iterating
+    a fixed-frequency ``dateutil.rrule``; see ``add_interval`` for the
+    meaning of ``wall_clock``.
+    """
+    dt, count = start, 0
+    while dt <= finish:
+        yield dt
+        count += 1
+        dt = add_interval(start, interval, count, wall_clock)
@@ -4,5 +4,6 @@ from django.conf.urls.defaults import *
 urlpatterns = patterns('',
     (r"event/", include('calendartools.urls.events')),
     (r"agenda/", include('calendartools.urls.agenda')),
+    (r"api/", include('calendartools.urls.api')),
 )
 urlpatterns += calendarpatterns
@@ -0,0 +1,15 @@
+from django.conf.urls.defaults import *
+from calendartools import views
+
+urlpatterns = patterns('',
+    url(r'^(?P<slug>[-A-Za-z0-9_]*)/(?P<year>\d{4})/$',
+        views.YearJSON.as_view(), name='year-json'),
+    url(r'^(?P<slug>[-A-Za-z0-9_]*)/(?P<year>\d{4})/(?P<month>\w{3})/$',
+        views.MonthJSON.as_view(), name='month-json'),
+    url(r'^(?P<slug>[-A-Za-z0-9_]*)/(?P<year>\d{4})/(?P<month>\w{3})/triple/$',
+        views.TriMonthJSON.as_view(), name='tri-month-json'),
+    url(r'^(?P<slug>[-A-Za-z0-9_]*)/(?P<year>\d{4})/(?P<week>[1-5]?\d)/$',
+        views.WeekJSON.as_view(), name='week-json'),
+    url(r'^(?P<slug>[-A-Za-z0-9_]*)/(?P<year>\d{4})/(?P<month>\w{3})/(?P<day>[0-3]?\d)/$',
+        views.DayJSON.as_view(), name='day-json'),
+)
@@ -1,7 +1,46 @@
-from datetime import datetime
+from bisect import bisect_right
+from datetime import datetime, timedelta
 
 from django.conf import settings
-from django.utils import timezone
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils import formats, timezone, translation
+
+# (time zone, year, month, day) -> the tzinfo to attach to any wall-clock
+# time of that local day. See ``get_local_tzinfo``.
+_local_tzinfos = {}
+_LOCAL_TZINFOS_SIZE = 4096
+
+def get_local_tzinfo(tzinfo, year, month, day):
+    """
+    Return the ``tzinfo`` instance that ``tzinfo.localize`` attaches to every
+    time on the given local day, or ``None`` if the day is within a day of a
+    DST (or other UTC offset) transition, where times have to be localized
+    one by one. The answer is cached per time zone and day, so a UTC offset
+    is only worked out once for each day a period touches.
+    """
+    transitions = getattr(tzinfo, '_utc_transition_times', None)
+    if transitions is None:
+        # A fixed-offset time zone (or a non-pytz one): ``make_aware`` just
+        # attaches it.
+        return tzinfo
+    key = (tzinfo.zone, year, month, day)
+    try:
+        return _local_tzinfos[key]
+    except KeyError:
+        pass
+    naive = datetime(year, month, day)
+    # Transition times are naive UTC; a local day lies within a day of the
+    # UTC day with the same date.
+    i = bisect_right(transitions, naive - timedelta(days=1))
+    if i < len(transitions) and transitions[i] <= naive + timedelta(days=2):
+        local_tzinfo = None
+    else:
+        local_tzinfo = tzinfo.localize(naive + timedelta(hours=12)).tzinfo
+    if len(_local_tzinfos) >= _LOCAL_TZINFOS_SIZE:
+        _local_tzinfos.clear()
+    _local_tzinfos[key] = local_tzinfo
+    return local_tzinfo
 
 def make_datetime(*datetime_values, **kwargs):
     """ Create an aware datetime. If a ``tzinfo`` keyword argument is supplied,
@@ -10,14 +49,28 @@ def make_datetime(*datetime_values, **kwargs):
 
     See https://docs.djangoproject.com/en/dev/topics/i18n/timezones/#default-current-time-zone
     for the definition of "current time zone."
-    """
-    naive_dt = datetime(*datetime_values)
 
+    The result is the same as ``timezone.make_aware``'s, but the UTC offset
+    is looked up once per local day (see ``get_local_tzinfo``) rather than
+    localized on every call.
+    """
     tzinfo = kwargs.get('tzinfo')
     if tzinfo is None:
         tzinfo = timezone.get_current_timezone()
 
-    return timezone.make_aware(naive_dt, tzinfo)
+    local_tzinfo = get_local_tzinfo(tzinfo, *datetime_values[:3])
+    if local_tzinfo is None:
+        return timezone.make_aware(datetime(*datetime_values), tzinfo)
+    return datetime(*datetime_values, tzinfo=local_tzinfo)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def epoch_microseconds(dt):
+    """The number of microseconds between the Unix epoch and the aware
+    datetime ``dt``."""
+    delta = dt - EPOCH
+    return ((delta.days * 86400 + delta.seconds) * 1000000 +
+            delta.microseconds)
 
 def timedelta_to_total_seconds(timedelta):
     '''
@@ -75,6 +128,33 @@ def standardise_first_dow(first_day_of_week=None):
     return DAY_MAP[first_day_of_week]
 
 
+_first_weekday_cache = {}
+
+def first_weekday():
+    """
+    The standardised (see ``standardise_first_dow``) first day of the week
+    for the active language.
+
+    The ``FIRST_DAY_OF_WEEK`` format is looked up once per language and then
+    cached; as the cache is keyed on the active language, activating another
+    language transparently switches to (or computes) its own value.
+    """
+    key = (translation.get_language(), settings.USE_L10N)
+    try:
+        return _first_weekday_cache[key]
+    except KeyError:
+        first_dow = standardise_first_dow(
+            formats.get_format('FIRST_DAY_OF_WEEK')
+        )
+        _first_weekday_cache[key] = first_dow
+        return first_dow
+
+@receiver(setting_changed)
+def clear_first_weekday_cache(sender, setting, **kwargs):
+    if setting in ('FIRST_DAY_OF_WEEK', 'USE_L10N', 'LANGUAGE_CODE',
+                   'FORMAT_MODULE_PATH'):
+        _first_weekday_cache.clear()
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
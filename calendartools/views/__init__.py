@@ -1,4 +1,5 @@
 from calendartools.views.agenda import *
+from calendartools.views.api import *
 from calendartools.views.calendars import *
 from calendartools.views.events import *
 from calendartools.views.ical import *
@@ -0,0 +1,122 @@
+import json
+
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+
+from calendartools.views.calendars import (
+    YearView, TriMonthView, MonthView, WeekView, DayView
+)
+
+def _isoformat(dt, tzinfo):
+    return dt and dt.astimezone(tzinfo).isoformat()
+
+# name -> function(occurrence, tzinfo) giving the occurrence's value for it
+OCCURRENCE_FIELDS = {
+    'id':         lambda o, tzinfo: o.pk,
+    'start':      lambda o, tzinfo: _isoformat(o.start, tzinfo),
+    'finish':     lambda o, tzinfo: _isoformat(o.finish, tzinfo),
+    'status':     lambda o, tzinfo: o.status,
+    'event':      lambda o, tzinfo: o.event.name,
+    'event_slug': lambda o, tzinfo: o.event.slug,
+    'url':        lambda o, tzinfo: o.get_absolute_url(),
+}
+
+
+class PeriodJSONMixin(object):
+    """
+    Turns a calendar view into a JSON endpoint, for client-side calendars.
+    The occurrences are selected with the same filters and visibility rules
+    as the HTML views, and the response is::
+
+        {"calendar": "slug", "period": "month", "timezone": "Europe/London",
+         "start": "...", "finish": "...",
+         "fields": ["id", "start", ...],
+         "occurrences": [[1, "2013-06-01T10:00:00+01:00", ...], ...]}
+
+    with each occurrence listed as its values for ``fields``, which a
+    ``fields`` query parameter (say ``?fields=id,start,event``) may choose
+    among ``OCCURRENCE_FIELDS``. Datetimes are given in the time zone of the
+    ``timezone`` parameter.
+
+    The response is streamed: occurrences are read from the database with
+    ``iterator()`` and encoded in chunks as they come, so that long periods
+    are never held in memory whole.
+    """
+    fields = ('id', 'start', 'finish', 'event', 'url')
+    chunk_size = 100
+    # A streamed response can't be kept in the page cache.
+    page_cache_timeout = 0
+
+    def get_fields(self):
+        fields = self.request.GET.get('fields')
+        if not fields:
+            return list(self.fields)
+        fields = [field.strip() for field in fields.split(',')
+                  if field.strip()]
+        unknown = [field for field in fields
+                   if field not in OCCURRENCE_FIELDS]
+        if unknown:
+            raise ValueError('Unknown fields: %s' % ', '.join(unknown))
+        return fields
+
+    def encode(self, period, fields, occurrences):
+        """Yield the JSON document for ``period`` in chunks."""
+        header = json.dumps({
+            'calendar': self.slug,
+            'period': self.period_name,
+            'timezone': self.timezone.zone,
+            'start': _isoformat(period.start, self.timezone),
+            'finish': _isoformat(period.finish, self.timezone),
+            'fields': fields,
+        }, separators=(',', ':'))
+        yield header[:-1] + ',"occurrences":['
+
+        getters = [OCCURRENCE_FIELDS[field] for field in fields]
+        tzinfo = self.timezone
+        chunk, separator = [], ''
+        for occurrence in occurrences.iterator():
+            chunk.append(separator + json.dumps(
+                [getter(occurrence, tzinfo) for getter in getters],
+                separators=(',', ':')
+            ))
+            separator = ','
+            if len(chunk) >= self.chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+        yield ''.join(chunk) + ']}'
+
+    def respond(self, request, *args, **kwargs):
+        try:
+            fields = self.get_fields()
+        except ValueError, e:
+            return HttpResponseBadRequest(unicode(e))
+        occurrences = self.get_dated_queryset()
+        occurrences = self.apply_filters(occurrences)
+        occurrences = self.allow_future_check(occurrences)
+        occurrences = self.allow_empty_check(occurrences)
+        # Look the calendar up now: once streaming has started, it's too late
+        # to answer with a 404.
+        self.calendar
+        return StreamingHttpResponse(
+            self.encode(self.period(self.date), fields, occurrences),
+            content_type='application/json'
+        )
+
+
+class YearJSON(PeriodJSONMixin, YearView):
+    pass
+
+
+class TriMonthJSON(PeriodJSONMixin, TriMonthView):
+    pass
+
+
+class MonthJSON(PeriodJSONMixin, MonthView):
+    pass
+
+
+class WeekJSON(PeriodJSONMixin, WeekView):
+    pass
+
+
+class DayJSON(PeriodJSONMixin, DayView):
+    pass
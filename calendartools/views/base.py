@@ -1,9 +1,14 @@
+from datetime import date, datetime, time
+import hashlib
+
 from django.conf import settings
-from django.db.models import Max, Min
+from django.core.cache import cache
+from django.db.models.query import QuerySet
 from django.db.models.loading import get_model
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
+from django.utils import timezone, translation
+from django.views.decorators.http import condition
 from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.list import BaseListView
 from django.views.generic.dates import DateMixin, _date_from_string
@@ -11,6 +16,10 @@ from django.views.generic.dates import DateMixin, _date_from_string
 import pytz
 
 from calendartools import defaults, forms
+from calendartools.cache import (
+    calendar_id, calendar_changed, calendar_version, get_calendar_bounds
+)
+from calendartools.periods import PeriodCache
 
 Calendar = get_model(defaults.CALENDAR_APP_LABEL, 'Calendar')
 Occurrence = get_model(defaults.CALENDAR_APP_LABEL, 'Occurrence')
@@ -24,6 +33,16 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
     date_attrs   = ['year', 'year_format', 'month', 'month_format', 'day',
                    'day_format']
     context_object_name = 'occurrences'
+    overlapping_occurrences = defaults.SHOW_OVERLAPPING_OCCURRENCES
+    # The database queries a page is expected to take: one for the
+    # occurrences, which bring their calendar along. A page without
+    # occurrences also looks up the calendar, a paginated one counts its
+    # occurrences, and the first after a change to the calendar works out
+    # its bounds again (see ``calendartools.cache``).
+    query_budget = 1
+    # Seconds the rendered page is cached for; 0 disables the page cache.
+    page_cache_timeout = defaults.CALENDAR_PAGE_CACHE_TIMEOUT
+    conditional_get = defaults.CALENDAR_CONDITIONAL_GET
 
     def __init__(self, *args, **kwargs):
         super(CalendarViewBase, self).__init__(*args, **kwargs)
@@ -43,8 +62,11 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
 
     @property
     def queryset(self):
+        # Filtering on the slug rather than the calendar saves looking the
+        # calendar up first: visible occurrences only belong to visible
+        # calendars, and bring theirs along (see ``get``).
         return Occurrence.objects.visible().select_related(
-                    'event', 'calendar').filter(calendar=self.calendar)
+                    'event', 'calendar').filter(calendar__slug=self.slug)
 
     @property
     def calendar(self):
@@ -56,10 +78,7 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
 
     @property
     def calendar_bounds(self):
-        return self.calendar.occurrences.visible().aggregate(
-            earliest_occurrence=Min('start'),
-            latest_occurrence=Max('finish'),
-        )
+        return get_calendar_bounds(self.calendar, self.request.user)
 
     def _get_kwargs_for_date_from_string(self):
         kwargs = {}
@@ -75,8 +94,9 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
         return _date_from_string(**kwargs)
 
     def create_period_object(self, dt, occurrences):
-        occurrences = occurrences or []
-        return self.period(dt, occurrences=occurrences)
+        period_cache = PeriodCache(occurrences or [],
+                                   overlap=self.overlapping_occurrences)
+        return period_cache.get(self.period, dt)
 
     def parse_filter_params(self):
         filter_params = {}
@@ -134,7 +154,13 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
         qs = self.get_queryset().filter(**lookup)
         date_field = self.get_date_field()
         period = self.period(self.date)
-        filter_kwargs = {'%s__range' % date_field: (period.start, period.finish)}
+        if self.overlapping_occurrences:
+            filter_kwargs = {'start__lte': period.finish,
+                             'finish__gt': period.start}
+        else:
+            filter_kwargs = {
+                '%s__range' % date_field: (period.start, period.finish)
+            }
         order = '' if ordering == 'asc' else '-'
         return qs.filter(**filter_kwargs).order_by("%s%s" % (order, date_field))
 
@@ -144,20 +170,105 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
             context[key] = callable(value) and value() or value
         return context
 
+    def calendar_from_occurrences(self, occurrences):
+        """Take the calendar from the occurrences already fetched, if any,
+        rather than looking it up."""
+        if isinstance(occurrences, QuerySet):
+            occurrences = occurrences._result_cache
+        if occurrences and not hasattr(self, '_calendar'):
+            self._calendar = occurrences[0].calendar
+
+    def get_variant(self):
+        """
+        A digest of what, besides the calendar's version (see
+        ``calendartools.cache``), the page depends on: the URL and its query
+        string - the filters and page number - the language and time zone in
+        use and today's date.
+        """
+        variant = u'|'.join((
+            self.request.get_full_path(),
+            translation.get_language() or u'',
+            timezone.get_current_timezone_name(),
+            date.today().isoformat(),
+        ))
+        return hashlib.md5(variant.encode('utf-8')).hexdigest()
+
+    def get_page_cache_key(self):
+        """The key the rendered page is cached under, or None if it isn't
+        cached."""
+        if not self.page_cache_timeout:
+            return None
+        pk = calendar_id(self.slug)
+        # Pages filtered on the current time would be served stale.
+        if pk is None or self.depends_on_time():
+            return None
+        return 'calendartools:page:%s:%s' % (
+            calendar_version(pk, self.request.user), self.get_variant()
+        )
+
+    def depends_on_time(self):
+        """Whether the page changes with the time rather than only with the
+        calendar: its occurrences are filtered on the current time."""
+        return ('period' in self.filter_params or
+                not self.get_allow_future())
+
+    def get_etag(self):
+        pk = calendar_id(self.slug)
+        if pk is None or self.depends_on_time():
+            return None
+        return hashlib.md5('%s:%s' % (
+            calendar_version(pk, self.request.user), self.get_variant()
+        )).hexdigest()
+
+    def get_last_modified(self):
+        # Unlike the ETag, the time doesn't tell pages for different users
+        # apart, so only anonymous pages - all seen alike - get one.
+        if self.request.user.is_authenticated():
+            return None
+        pk = calendar_id(self.slug)
+        if pk is None or self.depends_on_time():
+            return None
+        # Which day is today is highlighted.
+        midnight = timezone.make_aware(datetime.combine(date.today(), time()),
+                                       timezone.get_default_timezone())
+        return max(calendar_changed(pk), midnight)
+
     def get(self, request, *args, **kwargs):
         self.slug = kwargs.pop('slug', None)
         self.filter_params = self.parse_filter_params()
+        respond = self.respond
+        if self.conditional_get:
+            # The validators only need the calendar's version, so unchanged
+            # pages are answered before any period is built.
+            respond = condition(
+                etag_func=lambda request, *args, **kwargs: self.get_etag(),
+                last_modified_func=lambda request, *args, **kwargs:
+                    self.get_last_modified(),
+            )(respond)
+        return respond(request, *args, **kwargs)
+
+    def respond(self, request, *args, **kwargs):
+        cache_key = self.get_page_cache_key()
+        if cache_key:
+            response = cache.get(cache_key)
+            if response is not None:
+                return response
+
         occurrences = self.get_dated_queryset()
         occurrences = self.apply_filters(occurrences)
         occurrences = self.allow_future_check(occurrences)
         occurrences = self.allow_empty_check(occurrences)
+        self.dated_queryset = occurrences
 
-        context = self.get_context_data(**{
-            'calendar': self.calendar,
-            'object_list': occurrences,
-        })
+        context = self.get_context_data(object_list=occurrences)
+        # Building the period evaluates the occurrences, once: the template
+        # and any later count() read the queryset's result cache.
         self.period_object = self.create_period_object(self.date,
                                                        context['object_list'])
+        self.calendar_from_occurrences(context['object_list'])
+        context['calendar'] = self.calendar
+        context['cache_version'] = calendar_version(self.calendar.pk,
+                                                    self.request.user)
         context.update(self.calendar_bounds)
         context[self.period_name] = self.period_object
 
@@ -168,4 +279,9 @@ class CalendarViewBase(DateMixin, BaseListView, TemplateResponseMixin):
             initial={'timezone': self.timezone}
         )
 
-        return self.render_to_response(context)
+        response = self.render_to_response(context)
+        if cache_key:
+            response.add_post_render_callback(lambda response: cache.set(
+                cache_key, response, self.page_cache_timeout
+            ))
+        return response
@@ -7,14 +7,16 @@ from django.db.models.loading import get_model
 from django.http import Http404
 from django.shortcuts import render_to_response, get_object_or_404
 from django.template import RequestContext
-from django.utils import formats, timezone
+from django.utils import timezone
 from django.views.generic import ListView
 from django.views.generic.dates import YearMixin, MonthMixin, WeekMixin, DayMixin
 
 from calendartools import defaults
-from calendartools.periods import Year, TripleMonth, Month, Week, Day
+from calendartools.periods import (
+    PeriodCache, Year, TripleMonth, Month, Week, Day
+)
 from calendartools.views.base import CalendarViewBase
-from calendartools.utils import standardise_first_dow
+from calendartools.utils import first_weekday
 
 Calendar = get_model(defaults.CALENDAR_APP_LABEL, 'Calendar')
 Occurrence = get_model(defaults.CALENDAR_APP_LABEL, 'Occurrence')
@@ -38,6 +40,23 @@ class YearView(CalendarViewBase, YearMixin):
     period = Year
     template_name = "calendar/calendar/year.html"
     extra_context = {'size': 'small'}
+    # When True, the year is built from per-day occurrence counts worked out
+    # by the database instead of from the occurrences themselves.
+    day_counts_only = defaults.YEAR_VIEW_DAY_COUNTS
+    day_counts_by_status = False
+
+    def create_period_object(self, dt, occurrences):
+        if not self.day_counts_only:
+            return super(YearView, self).create_period_object(dt, occurrences)
+        period_cache = PeriodCache(day_counts=self.dated_queryset.day_counts(
+            timezone.get_current_timezone(), by_status=self.day_counts_by_status
+        ))
+        return period_cache.get(self.period, dt)
+
+    def get_context_data(self, **kwargs):
+        context = super(YearView, self).get_context_data(**kwargs)
+        context['day_counts_only'] = self.day_counts_only
+        return context
 
     @property
     def date(self):
@@ -68,8 +87,7 @@ class WeekView(CalendarViewBase, YearMixin, WeekMixin):
 
     @property
     def week_format(self):
-        first_dow = standardise_first_dow(formats.get_format('FIRST_DAY_OF_WEEK'))
-        return '%W' if first_dow == calendar.MONDAY else '%U'
+        return '%W' if first_weekday() == calendar.MONDAY else '%U'
 
     @property
     def date(self):
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+Benchmark the periods engine over synthetic occurrence sets.
+
+    ./runbenchmarks.py --save baseline.json
+    ./runbenchmarks.py --compare baseline.json
+
+With ``--compare``, exits with status 1 if any benchmark got more than
+``--threshold`` times (and ``--min-delta`` seconds) slower, or more than
+``--threshold`` times hungrier, than in the baseline.
+"""
+
+import os, sys
+from optparse import OptionParser
+from os import path
+
+def csv(values, cast=str):
+    return tuple(cast(value) for value in values.split(','))
+
+def main():
+    current_path = path.abspath(path.dirname(__file__))
+    sys.path.insert(0, path.join(current_path, 'test_project'))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'test_project.settings'
+
+    from benchmarks import suite
+    from benchmarks.datasets import SIZES, DISTRIBUTIONS, TIMEZONES
+
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--cases', default=','.join(suite.CASE_NAMES),
+                      help='comma separated cases [%default]')
+    parser.add_option('--sizes', default=','.join(map(str, SIZES)),
+                      help='comma separated dataset sizes [%default]')
+    parser.add_option('--distributions', default=','.join(DISTRIBUTIONS),
+                      help='comma separated distributions [%default]')
+    parser.add_option('--timezones', default=','.join(TIMEZONES),
+                      help='comma separated time zones [%default]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='minimum runs per benchmark, best time kept '
+                           '[%default]')
+    parser.add_option('--min-time', type='float', default=1.0,
+                      help='seconds each benchmark is run for at least '
+                           '[%default]')
+    parser.add_option('--save', metavar='FILE',
+                      help='save the results as a baseline')
+    parser.add_option('--compare', metavar='FILE',
+                      help='compare the results with a saved baseline')
+    parser.add_option('--threshold', type='float', default=1.2,
+                      help='slowdown ratio reported as a regression '
+                           '[%default]')
+    parser.add_option('--min-delta', type='float', default=0.01,
+                      help='seconds a benchmark must also slow down by to '
+                           'be reported as a regression [%default]')
+    options, args = parser.parse_args()
+
+    results = suite.run(
+        cases=csv(options.cases), sizes=csv(options.sizes, int),
+        distributions=csv(options.distributions),
+        timezones=csv(options.timezones), repeat=options.repeat,
+        min_time=options.min_time
+    )
+    if options.save:
+        suite.save(results, options.save)
+    if options.compare:
+        regressions = suite.compare(results, suite.load(options.compare),
+                                    options.threshold, options.min_delta)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
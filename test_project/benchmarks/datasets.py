@@ -0,0 +1,76 @@
+"""
+Synthetic occurrence sets for the period benchmarks.
+
+Datasets are generated from a fixed seed, so every run (and every machine)
+benchmarks exactly the same occurrences.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytz
+
+SIZES = (1000, 10000, 100000)
+DISTRIBUTIONS = ('uniform', 'bursty')
+TIMEZONES = ('UTC', 'Europe/Paris', 'America/New_York')
+
+# Occurrences are spread over this year (and a little either side of it, so
+# that the boundary weeks of the first and last months are populated).
+YEAR = 2013
+SPAN_START = datetime(YEAR, 1, 1) - timedelta(days=7)
+SPAN_SECONDS = (366 + 14) * 86400
+BURSTS = 40
+SEED = 2013
+
+
+class SyntheticOccurrence(object):
+    """Just enough of an ``Occurrence`` for the periods to work with."""
+    __slots__ = ('start', 'finish')
+
+    def __init__(self, start, finish):
+        self.start = start
+        self.finish = finish
+
+    def __repr__(self):
+        return '<SyntheticOccurrence: %s - %s>' % (self.start, self.finish)
+
+
+def _uniform_offsets(rand, size):
+    return [rand.randrange(SPAN_SECONDS) for i in xrange(size)]
+
+def _bursty_offsets(rand, size):
+    """Offsets clustered around a few busy days, like a conference schedule
+    or a ticket sale, with a thin uniform background."""
+    centres = [rand.randrange(SPAN_SECONDS) for i in xrange(BURSTS)]
+    offsets = []
+    for i in xrange(size):
+        if rand.random() < 0.1:
+            offsets.append(rand.randrange(SPAN_SECONDS))
+        else:
+            offset = rand.choice(centres) + int(rand.gauss(0, 6 * 3600))
+            offsets.append(min(max(offset, 0), SPAN_SECONDS - 1))
+    return offsets
+
+_offsets = {
+    'uniform': _uniform_offsets,
+    'bursty': _bursty_offsets,
+}
+
+def make_occurrences(size, distribution='uniform', tz='UTC'):
+    """
+    Return ``size`` occurrences, in start order, whose starts follow
+    ``distribution`` ('uniform' or 'bursty') and which are aware datetimes
+    in the time zone named ``tz``. Occurrences last from 15 minutes to
+    3 hours, in 15 minute steps.
+    """
+    rand = random.Random('%s-%s-%s' % (SEED, size, distribution))
+    tzinfo = pytz.timezone(tz)
+    start = pytz.utc.localize(SPAN_START)
+    occurrences = []
+    for offset in sorted(_offsets[distribution](rand, size)):
+        occurrence_start = start + timedelta(seconds=offset)
+        duration = timedelta(minutes=15 * rand.randint(1, 12))
+        occurrences.append(SyntheticOccurrence(
+            occurrence_start.astimezone(tzinfo),
+            (occurrence_start + duration).astimezone(tzinfo)
+        ))
+    return occurrences
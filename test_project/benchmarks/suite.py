@@ -0,0 +1,242 @@
+"""
+Benchmarks for the periods engine.
+
+Each case builds a period the way the calendar views do - through a
+``PeriodCache`` over the occurrences the view's queryset would return - and
+walks the children its template renders. Cases run in a forked child
+process, so that every measurement starts from cold caches and its peak
+memory can be read from ``getrusage``: the parent never builds a period
+itself. Each case is run until it has taken some minimum time, so that
+short cases are timed over enough runs for their best time to be steady.
+"""
+import gc
+import json
+import os
+import resource
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from timeit import default_timer
+
+import pytz
+
+from django.utils import timezone, translation
+
+from calendartools.periods import (
+    PeriodCache, Year, TripleMonth, Month, Week, Day
+)
+from benchmarks.datasets import (
+    YEAR, SIZES, DISTRIBUTIONS, TIMEZONES, make_occurrences
+)
+
+
+def _walk_days(days):
+    for day in days:
+        if day:
+            day.occurrences
+            day.get_month().abbr
+
+def year_case(cache):
+    """The year view: each month's calendar grid."""
+    year = cache.get(Year, date(YEAR, 1, 1))
+    for month in year.months:
+        for week in month.calendar_display:
+            _walk_days(week)
+
+def triple_month_case(cache):
+    """The tri-month view: three month grids and their weeks."""
+    triple_month = cache.get(TripleMonth, date(YEAR, 6, 1))
+    for month in triple_month.months:
+        for week in month.weeks:
+            week.occurrences
+        for week in month.calendar_display:
+            _walk_days(week)
+
+def month_case(cache):
+    """The month view: its weeks, days and calendar grid."""
+    month = cache.get(Month, date(YEAR, 6, 1))
+    for week in month.weeks:
+        _walk_days(week.days)
+    _walk_days(month.days)
+    for week in month.calendar_display:
+        _walk_days(week)
+
+def week_case(cache):
+    """The week view: the time-slot grid of its days."""
+    week = cache.get(Week, date(YEAR, 6, 12))
+    for row in week.calendar_display:
+        for interval in row:
+            interval.occurrences
+
+def day_case(cache):
+    """The day view: its hours and time slots."""
+    day = cache.get(Day, date(YEAR, 6, 12))
+    for hour in day.hours:
+        hour.occurrences
+    for interval in day.intervals:
+        interval.occurrences
+
+# name -> (function, first and last days of the period it renders). The days
+# are given rather than worked out from a period, which would warm the caches
+# of the periods engine before the cases run.
+CASES = (
+    ('year', year_case, date(YEAR, 1, 1), date(YEAR, 12, 31)),
+    ('triple_month', triple_month_case, date(YEAR, 6, 1), date(YEAR, 8, 31)),
+    ('month', month_case, date(YEAR, 6, 1), date(YEAR, 6, 30)),
+    ('week', week_case, date(YEAR, 6, 10), date(YEAR, 6, 16)),
+    ('day', day_case, date(YEAR, 6, 12), date(YEAR, 6, 12)),
+)
+CASE_NAMES = tuple(case[0] for case in CASES)
+
+
+def visible_occurrences(occurrences, starts, first, last, tz):
+    """The occurrences a view of the period from the day ``first`` to the
+    day ``last`` in the time zone named ``tz`` would load: those starting up
+    to a week either side of it, covering the boundary weeks of its grid."""
+    tzinfo = pytz.timezone(tz)
+    since = tzinfo.localize(datetime.combine(first - timedelta(days=7),
+                                             datetime.min.time()))
+    until = tzinfo.localize(datetime.combine(last + timedelta(days=8),
+                                             datetime.min.time()))
+    return occurrences[bisect_left(starts, since):bisect_left(starts, until)]
+
+def _status_kib(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+def _memory_probe():
+    """
+    Return a function giving the peak memory growth, in KiB, since the probe
+    was made. On Linux the process's high-water mark is reset so the peak
+    is exact; elsewhere ``ru_maxrss`` can only grow, so smaller peaks than
+    the process's previous one read as no growth.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        before = _status_kib('VmRSS')
+        return lambda: _status_kib('VmHWM') - before
+    except (IOError, OSError, TypeError):
+        getrusage = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        before = getrusage()
+        return lambda: max(getrusage() - before, 0)
+
+def _run_case(function, occurrences):
+    """Time ``function`` over ``occurrences`` and return (seconds, peak
+    memory growth in KiB)."""
+    gc.collect()
+    probe = _memory_probe()
+    started = default_timer()
+    function(PeriodCache(occurrences))
+    elapsed = default_timer() - started
+    return elapsed, probe()
+
+def _run_forked(function, occurrences):
+    if not hasattr(os, 'fork'):
+        return _run_case(function, occurrences)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # child
+        os.close(read_fd)
+        status = 0
+        try:
+            try:
+                result = json.dumps(_run_case(function, occurrences))
+            except Exception, e:
+                result = json.dumps({'error': repr(e)})
+                status = 1
+            with os.fdopen(write_fd, 'w') as output:
+                output.write(result)
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as result:
+        data = json.loads(result.read() or 'null')
+    os.waitpid(pid, 0)
+    if not isinstance(data, list):
+        raise RuntimeError('Benchmark failed: %s' % (data or {}).get('error'))
+    return tuple(data)
+
+def run(cases=CASE_NAMES, sizes=SIZES, distributions=DISTRIBUTIONS,
+        timezones=TIMEZONES, repeat=5, min_time=1.0, stream=sys.stdout):
+    """
+    Run the selected benchmarks and return a dict mapping each benchmark's
+    name ('case/size/distribution/time zone') to its best time in seconds
+    and its largest peak memory growth in KiB over its runs: at least
+    ``repeat`` of them, and as many more as fit in ``min_time`` seconds.
+    """
+    results = {}
+    translation.activate('en-gb')
+    try:
+        for size in sizes:
+            for distribution in distributions:
+                for tz in timezones:
+                    with timezone.override(tz):
+                        occurrences = make_occurrences(size, distribution, tz)
+                        starts = [o.start for o in occurrences]
+                        for name, function, first, last in CASES:
+                            if name not in cases:
+                                continue
+                            visible = visible_occurrences(
+                                occurrences, starts, first, last, tz
+                            )
+                            runs = []
+                            started = default_timer()
+                            while (len(runs) < repeat or
+                                   default_timer() - started < min_time):
+                                runs.append(_run_forked(function, visible))
+                            key = '/'.join((name, str(size), distribution, tz))
+                            results[key] = {
+                                'time': min(r[0] for r in runs),
+                                'memory': max(r[1] for r in runs),
+                                'occurrences': len(visible),
+                                'runs': len(runs),
+                            }
+                            stream.write('%-48s %10.4fs %8d KiB\n' % (
+                                key, results[key]['time'],
+                                results[key]['memory']
+                            ))
+                            stream.flush()
+    finally:
+        translation.deactivate()
+    return results
+
+def save(results, filename):
+    with open(filename, 'w') as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+
+def load(filename):
+    with open(filename) as baseline:
+        return json.load(baseline)
+
+def compare(results, baseline, threshold=1.2, min_delta=0.01,
+            stream=sys.stdout):
+    """
+    Compare ``results`` with the ``baseline`` results of an earlier run and
+    return the names of the benchmarks whose time or memory grew by more
+    than ``threshold`` times. Times must also have grown by more than
+    ``min_delta`` seconds: the best of millisecond runs still varies by
+    more than ``threshold`` from one run of the suite to the next.
+    Benchmarks missing from either are skipped.
+    """
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        new, old = results[key], baseline[key]
+        time_ratio = new['time'] / old['time'] if old['time'] else 1.0
+        time_regressed = (time_ratio > threshold and
+                          new['time'] - old['time'] > min_delta)
+        # Memory growth is only measured in whole KiB; ignore tiny changes.
+        memory_ratio = (float(new['memory']) / old['memory']
+                        if old['memory'] > 1024 else 1.0)
+        regressed = time_regressed or memory_ratio > threshold
+        if regressed:
+            regressions.append(key)
+        stream.write('%-48s time x%.2f  memory x%.2f%s\n' % (
+            key, time_ratio, memory_ratio, '  REGRESSION' if regressed else ''
+        ))
+    return regressions
@@ -1,3 +1,4 @@
+from test_cache import *
 from test_context_processors import *
 from test_defaults import *
 from test_fields import *
@@ -6,4 +7,5 @@ from test_models import *
 from test_managers import *
 from test_periods import *
 from test_templatetags import *
+from test_utils import *
 from test_views import *
@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import pre_save, post_init
+from django.test import TestCase
+from django.utils import timezone
+from nose.tools import *
+
+from calendartools import defaults
+from calendartools.cache import (
+    visibility, get_calendar_bounds, calendar_id, calendar_generation,
+    calendar_changed, calendar_version, invalidate_calendar, PUBLIC, ADMIN
+)
+from event.models import Calendar, Event, Occurrence
+
+
+class TestCalendarBounds(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('user', 'user@test.com', 'pw')
+        self.admin = User.objects.create_user('admin', 'admin@test.com', 'pw')
+        self.admin.is_staff = True
+        self.admin.save()
+        self.calendar = Calendar.objects.create(name='Basic', slug='basic')
+        self.event = Event.objects.create(name='Event', slug='event',
+                                          creator=self.user)
+        self.start = timezone.now() + timedelta(days=1)
+        self.occurrences = [
+            Occurrence.objects.create(
+                calendar=self.calendar, event=self.event,
+                start=self.start + timedelta(days=i),
+                finish=self.start + timedelta(days=i, hours=1)
+            ) for i in range(3)
+        ]
+
+    def bounds(self, user=None):
+        bounds = get_calendar_bounds(self.calendar, user or self.user)
+        return bounds['earliest_occurrence'], bounds['latest_occurrence']
+
+    def test_visibility(self):
+        assert_equal(visibility(self.user), PUBLIC)
+        assert_equal(visibility(self.admin), ADMIN)
+        assert_equal(visibility(None), PUBLIC)
+
+        check = defaults.view_hidden_calendars_check
+        defaults.view_hidden_calendars_check = lambda user: False
+        try:
+            assert_equal(visibility(self.admin), 'events+occurrences')
+        finally:
+            defaults.view_hidden_calendars_check = check
+
+    def test_cached(self):
+        expected = (self.start, self.start + timedelta(days=2, hours=1))
+        with self.assertNumQueries(1):
+            assert_equal(self.bounds(), expected)
+        with self.assertNumQueries(0):
+            assert_equal(self.bounds(), expected)
+
+    def test_invalidated_by_occurrence_writes(self):
+        self.bounds()
+        later = self.start + timedelta(days=10)
+        occurrence = Occurrence.objects.create(
+            calendar=self.calendar, event=self.event,
+            start=later, finish=later + timedelta(hours=1)
+        )
+        assert_equal(self.bounds()[1], later + timedelta(hours=1))
+
+        occurrence.delete()
+        assert_equal(self.bounds()[1], self.start + timedelta(days=2, hours=1))
+
+        self.occurrences[0].status = Occurrence.STATUS.hidden
+        self.occurrences[0].save()
+        assert_equal(self.bounds()[0], self.start + timedelta(days=1))
+
+    def test_invalidated_by_occurrence_move(self):
+        other = Calendar.objects.create(name='Other', slug='other')
+        self.bounds()
+        occurrence = Occurrence.objects.get(pk=self.occurrences[-1].pk)
+        occurrence.calendar = other
+        occurrence.save()
+        assert_equal(self.bounds()[1], self.start + timedelta(days=1, hours=1))
+
+        # And back again.
+        self.bounds()
+        occurrence.calendar = self.calendar
+        occurrence.save()
+        assert_equal(self.bounds()[1], self.start + timedelta(days=2, hours=1))
+
+    def test_only_writes_of_moved_models_look_up_stored_values(self):
+        assert pre_save.has_listeners(Occurrence)
+        assert pre_save.has_listeners(Calendar)
+        assert not pre_save.has_listeners(Event)
+        assert not post_init.has_listeners(Occurrence)
+
+    def test_invalidated_by_event_status(self):
+        self.bounds()
+        self.event.status = Event.STATUS.hidden
+        self.event.save()
+        assert_equal(self.bounds(), (None, None))
+
+    def test_separate_admin_and_public_values(self):
+        self.occurrences[-1].status = Occurrence.STATUS.hidden
+        self.occurrences[-1].save()
+        assert_equal(self.bounds()[1], self.start + timedelta(days=1, hours=1))
+        assert_equal(self.bounds(self.admin)[1],
+                     self.start + timedelta(days=2, hours=1))
+
+    def test_invalidate_calendar(self):
+        self.bounds()
+        Occurrence.objects.filter(pk=self.occurrences[0].pk).update(
+            status=Occurrence.STATUS.hidden
+        )
+        assert_equal(self.bounds()[0], self.start)
+        invalidate_calendar(self.calendar.pk)
+        assert_equal(self.bounds()[0], self.start + timedelta(days=1))
+
+
+class TestCalendarGeneration(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('user', 'user@test.com', 'pw')
+        self.calendar = Calendar.objects.create(name='Basic', slug='basic')
+        self.event = Event.objects.create(name='Event', slug='event',
+                                          creator=self.user)
+
+    def test_calendar_id(self):
+        with self.assertNumQueries(1):
+            assert_equal(calendar_id('basic'), self.calendar.pk)
+        with self.assertNumQueries(0):
+            assert_equal(calendar_id('basic'), self.calendar.pk)
+        assert_equal(calendar_id('missing'), None)
+
+        self.calendar.slug = 'renamed'
+        self.calendar.save()
+        other = Calendar.objects.create(name='Basic', slug='basic')
+        assert_equal(other.slug, 'basic')
+        assert_equal(calendar_id('basic'), other.pk)
+
+    def test_calendar_id_after_rename(self):
+        assert_equal(calendar_id('basic'), self.calendar.pk)
+        calendar = Calendar.objects.get(pk=self.calendar.pk)
+        calendar.slug = 'renamed'
+        calendar.save()
+        assert_equal(calendar_id('basic'), None)
+        assert_equal(calendar_id('renamed'), calendar.pk)
+        calendar.slug = 'again'
+        calendar.save()
+        assert_equal(calendar_id('renamed'), None)
+
+    def test_bumped_by_writes(self):
+        pk = self.calendar.pk
+        generation = calendar_generation(pk)
+        assert_equal(calendar_generation(pk), generation)
+
+        start = timezone.now() + timedelta(days=1)
+        occurrence = Occurrence.objects.create(
+            calendar=self.calendar, event=self.event,
+            start=start, finish=start + timedelta(hours=1)
+        )
+        generations = [calendar_generation(pk)]
+        self.event.save()
+        generations.append(calendar_generation(pk))
+        occurrence.delete()
+        generations.append(calendar_generation(pk))
+        self.calendar.save()
+        generations.append(calendar_generation(pk))
+        assert generation < generations[0]
+        assert_equal(generations, sorted(set(generations)))
+
+    def test_changed(self):
+        before = timezone.now().replace(microsecond=0)
+        invalidate_calendar(self.calendar.pk)
+        changed = calendar_changed(self.calendar.pk)
+        assert before <= changed <= timezone.now()
+        self.calendar.save()
+        assert calendar_changed(self.calendar.pk) > changed
+
+    def test_version(self):
+        admin = User.objects.create_user('admin', 'admin@test.com', 'pw')
+        admin.is_staff = True
+        pk = self.calendar.pk
+        version = calendar_version(pk, self.user)
+        assert_not_equal(version, calendar_version(pk, admin))
+        invalidate_calendar(pk)
+        assert_not_equal(version, calendar_version(pk, self.user))
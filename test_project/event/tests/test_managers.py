@@ -1,10 +1,15 @@
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+
+import pytz
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.utils.unittest import skipUnless
 from django.utils import timezone
 
 from nose.tools import *
+from calendartools.managers import utc_offset_spans
 from event.models import Calendar, Event, Occurrence, Attendance
 
 
@@ -117,6 +122,90 @@ class TestOccurrenceManager(TestCommonManager):
             set(Occurrence.objects.exclude(status__in=Occurrence.objects.hidden_statuses_for_admins))
         )
 
+    def test_day_counts(self):
+        paris = pytz.timezone('Europe/Paris')
+        year = self.start.year + 2
+        late = paris.localize(datetime(year, 3, 30, 23, 30))
+        Occurrence.objects.create(
+            event=self.event, start=late, finish=late + timedelta(hours=2),
+            calendar=self.calendar
+        )
+        occurrences = Occurrence.objects.filter(start__year=year)
+        assert_equal(occurrences.day_counts(paris), {date(year, 3, 30): 1})
+        assert_equal(occurrences.day_counts(pytz.timezone('Asia/Tokyo')),
+                     {date(year, 3, 31): 1})
+
+        today = timezone.localtime(self.start, paris).date()
+        counts = Occurrence.objects.exclude(start__year=year).day_counts(
+            paris, by_status=True
+        )
+        assert_equal(counts, {
+            today: dict((status, 1) for status, label in Occurrence.STATUS)
+        })
+        assert_equal(Occurrence.objects.filter(start__year=1900).day_counts(),
+                     {})
+
+    def test_day_counts_grouped_by_database(self):
+        paris = pytz.timezone('Europe/Paris')
+        first = paris.localize(datetime(self.start.year + 2, 1, 1))
+        statuses = [status for status, label in Occurrence.STATUS]
+        # Through a year, at all times of the day, over both changes of the
+        # clocks.
+        starts = [first + timedelta(minutes=i * 1753) for i in range(300)]
+        Occurrence.objects.bulk_create([
+            Occurrence(event=self.event, calendar=self.calendar, start=start,
+                       finish=start + timedelta(hours=1),
+                       status=statuses[i % len(statuses)])
+            for i, start in enumerate(starts)
+        ])
+        occurrences = Occurrence.objects.filter(start__gte=first)
+        for zone in ('Europe/Paris', 'Asia/Tokyo', 'Asia/Kathmandu',
+                     'America/St_Johns', 'UTC'):
+            tzinfo = pytz.timezone(zone)
+            expected, expected_statuses = {}, {}
+            for i, start in enumerate(starts):
+                day = start.astimezone(tzinfo).date()
+                expected[day] = expected.get(day, 0) + 1
+                status = statuses[i % len(statuses)]
+                day_statuses = expected_statuses.setdefault(day, {})
+                day_statuses[status] = day_statuses.get(status, 0) + 1
+            # One query per span of time with the same UTC offset, and one
+            # for those spans - or just one on PostgreSQL.
+            spans = len(utc_offset_spans(tzinfo, starts[0], starts[-1]))
+            queries = (1 if connection.vendor == 'postgresql' or zone == 'UTC'
+                       else spans + 1)
+            with self.assertNumQueries(queries):
+                assert_equal(occurrences.day_counts(tzinfo), expected)
+            assert_equal(occurrences.day_counts(tzinfo, by_status=True),
+                         expected_statuses)
+
+    @skipUnless(connection.vendor == 'postgresql',
+                'Days are only converted by the database on PostgreSQL')
+    def test_day_counts_at_time_zone(self):
+        paris = pytz.timezone('Europe/Paris')
+        year = self.start.year + 2
+        # Either side of midnight in Paris, and of midnight in Tokyo.
+        for day, hour in ((30, 23), (31, 1), (31, 23)):
+            start = paris.localize(datetime(year, 3, day, hour, 30))
+            Occurrence.objects.create(
+                event=self.event, start=start,
+                finish=start + timedelta(hours=2), calendar=self.calendar,
+                status=Occurrence.STATUS.cancelled if day == 31 else
+                       Occurrence.STATUS.published
+            )
+        occurrences = Occurrence.objects.filter(start__year=year)
+        with self.assertNumQueries(1):
+            counts = occurrences.day_counts(paris)
+        assert_equal(counts, {date(year, 3, 30): 1, date(year, 3, 31): 2})
+        with self.assertNumQueries(1):
+            counts = occurrences.day_counts(paris, by_status=True)
+        assert_equal(counts, {
+            date(year, 3, 30): {Occurrence.STATUS.published: 1},
+            date(year, 3, 31): {Occurrence.STATUS.cancelled: 2},
+        })
+        assert_equal(occurrences.day_counts(pytz.timezone('Asia/Tokyo')),
+                     {date(year, 3, 31): 2, date(year, 4, 1): 1})
+
     def test_visible_with_inactive_event(self):
         self.event.status = Event.STATUS.inactive
         self.event.save()
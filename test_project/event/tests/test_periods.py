@@ -1,5 +1,7 @@
 # -*- coding: UTF-8 -*-
 import calendar
+import pickle
+import threading
 from datetime import datetime, date, time, timedelta
 from dateutil.rrule import rrule, MONTHLY, WEEKLY, HOURLY, DAILY
 
@@ -7,16 +9,23 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils.dates import MONTHS, MONTHS_3, WEEKDAYS, WEEKDAYS_ABBR
 from django.utils import translation, timezone
+from django.utils.tzinfo import FixedOffset
 
 from django.test import TestCase
 from nose.tools import *
 
 from calendartools import defaults
 from calendartools.periods import (
-    SimpleProxy, Period, Year, Month, Week, Day, Hour, TripleMonth,
+    SimpleProxy, DateTimeProxy, Period, Year, Month, Week, Day, DayInterval,
+    Hour, TripleMonth,
+    OccurrenceIndex, PeriodCache, PeriodRange, PeriodSkeletons, SlidingWindow,
+    dump_period, load_period,
     first_day_of_week
 )
-from calendartools.utils import make_datetime
+from calendartools.utils import (
+    make_datetime, first_weekday, epoch_microseconds
+)
+from calendartools.periods import bucketing
 from calendartools.validators.defaults.occurrence import (
     activate_default_occurrence_validators,
     deactivate_default_occurrence_validators
@@ -53,6 +62,33 @@ class TestSimpleProxy(TestCase):
         assert self.proxy > other_proxy
 
 
+class TestDateTimeProxy(TestCase):
+    def setUp(self):
+        self.datetime = timezone.now()
+        self.proxy = DateTimeProxy(self.datetime)
+
+    def test_getattr(self):
+        for prop in ('year', 'month', 'day', 'hour', 'minute', 'second',
+                     'microsecond', 'tzinfo'):
+            assert_equal(getattr(self.proxy, prop), getattr(self.datetime, prop))
+        assert_equal(self.proxy.weekday(), self.datetime.weekday())
+        assert_equal(self.proxy.strftime('%Y/%m/%d'),
+                     self.datetime.strftime('%Y/%m/%d'))
+        assert_equal(self.proxy.ctime(), self.datetime.ctime())
+        assert_raises(AttributeError, getattr, self.proxy, 'foo')
+
+    def test_no_instance_dict(self):
+        assert_raises(AttributeError, setattr, self.proxy, 'foo', 'foo')
+        for period in (Year, TripleMonth, Month, Week, Day, Hour):
+            assert not hasattr(period(self.datetime), '__dict__')
+
+    def test_comparisons(self):
+        other_proxy = DateTimeProxy(self.datetime)
+        assert_equal(self.proxy, other_proxy)
+        assert other_proxy + timedelta(1) > self.proxy
+        assert other_proxy - timedelta(1) < self.proxy
+
+
 class TestDateTimeProxies(TestCase):
     def setUp(self):
         translation.activate('en-gb')
@@ -399,6 +435,45 @@ class TestDateTimeProxies(TestCase):
         assert_equal(len(intervals), expected_interval_count)
 
 
+class TestDaylightSavingTransitions(TestCase):
+    # settings.TIME_ZONE is Europe/Paris: the clocks went forward on
+    # 2013-03-31 and back on 2013-10-27.
+    def setUp(self):
+        translation.activate('en-gb')
+        self.spring = Day(date(2013, 3, 31))
+        self.autumn = Day(date(2013, 10, 27))
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_day_finish(self):
+        smidge = timedelta.resolution
+        assert_equal(self.spring.finish, make_datetime(2013, 4, 1) - smidge)
+        assert_equal(self.autumn.finish, make_datetime(2013, 10, 28) - smidge)
+
+    def test_day_hours(self):
+        assert_equal(len(self.spring.hours), 23)
+        assert_equal(len(self.autumn.hours), 25)
+        hours = self.spring.hours
+        assert_equal([h.hour for h in hours[:3]], [0, 1, 3])
+        for previous, hour in zip(hours, hours[1:]):
+            assert_equal(hour.start - previous.start, timedelta(hours=1))
+
+    def test_days_are_local_midnights(self):
+        for period in (Week(date(2013, 3, 31)), Month(date(2013, 10, 1))):
+            for day in period.days:
+                assert_equal(day.start, make_datetime(day.year, day.month,
+                                                      day.day))
+        months = Year(date(2013, 1, 1)).months
+        assert_equal([m.start for m in months],
+                     [make_datetime(2013, i, 1) for i in range(1, 13)])
+
+    def test_hour_minutes(self):
+        minutes = list(Hour(datetime(2013, 3, 31, 1)))
+        assert_equal(len(minutes), 60)
+        assert_equal(minutes[-1], make_datetime(2013, 3, 31, 1, 59))
+
+
 class TestLocalization(TestCase):
     def setUp(self):
         self.datetime = make_datetime(1982, 8, 17)
@@ -563,6 +638,22 @@ class TestFirstDayOfWeek(TestCase):
             assert_equal(obj.day_names_abbr[0], 'Sun')
             assert_equal(obj.day_names_abbr[6], 'Sat')
 
+    def test_first_weekday_follows_active_language(self):
+        assert_equal(first_weekday(), calendar.MONDAY)
+        translation.activate('en-us')
+        assert_equal(first_weekday(), calendar.SUNDAY)
+        translation.activate('en-gb')
+        assert_equal(first_weekday(), calendar.MONDAY)
+
+    def test_month_calendar_display_usa(self):
+        translation.activate('en-us')
+        month = Month(datetime(1982, 8, 17))
+        actual = [[i.day if i else 0 for i in lst]
+                  for lst in month.calendar_display]
+        expected = calendar.Calendar(calendar.SUNDAY).monthdayscalendar(1982, 8)
+        assert_equal(actual, expected)
+        assert_equal(actual[0][0], 1) # August 1st, 1982 was a Sunday
+
     def test_week_properties(self):
         self.week = Week(datetime(1982, 8, 17))
         assert_equal(self.week.start, make_datetime(1982, 8, 16))
@@ -603,6 +694,27 @@ class TestTripleMonth(TestCase):
     def test_third_month_property(self):
         assert_equal(self.trimonth.third_month, self.expected[2])
 
+    def test_months_share_children(self):
+        translation.activate('en-gb')
+        try:
+            occurrences = [FakeOccurrence(make_datetime(1982, 8, d, 12))
+                           for d in (1, 30, 31)]
+            occurrences.append(FakeOccurrence(make_datetime(1982, 9, 1, 12)))
+            trimonth = TripleMonth(self.datetime, occurrences=occurrences)
+            august, september, october = trimonth.months
+            assert trimonth.first_month is august
+            assert trimonth.second_month is september
+            assert trimonth.third_month is october
+            # The week of 30 August is the last of August's and the first of
+            # September's.
+            assert august.weeks[-1] is september.weeks[0]
+            assert_equal(august.weeks[-1].occurrences, occurrences[1:])
+            assert_equal(august.occurrences, occurrences[:3])
+            assert august.days[0].get_month() is august
+            assert august.get_year() is trimonth.months[1].get_year()
+        finally:
+            translation.deactivate()
+
 
 class TestWeek(TestCase):
     def setUp(self):
@@ -692,6 +804,605 @@ class TestDateTimeProxiesWithOccurrences(TestCase):
                                 assert_equal(len(hour.occurrences), 2)
 
 
+class FakeOccurrence(object):
+    def __init__(self, start, finish=None):
+        self.start = start
+        self.finish = finish or start + timedelta(hours=1)
+
+    def __repr__(self):
+        return '<FakeOccurrence: %s>' % self.start
+
+def staggered_occurrences(count=300):
+    """``count`` occurrences every 7 hours from 1982-08-14 22:00, lasting
+    from 1 to 37 hours."""
+    start = make_datetime(1982, 8, 14, 22)
+    return [FakeOccurrence(start + timedelta(hours=i * 7),
+                           start + timedelta(hours=i * 7 + i % 5 * 9 + 1))
+            for i in range(count)]
+
+
+class NumpyBucketingMixin(object):
+    """Restores ``defaults.NUMPY_BUCKETING`` after each test."""
+
+    def setUp(self):
+        super(NumpyBucketingMixin, self).setUp()
+        self.original_numpy_bucketing = defaults.NUMPY_BUCKETING
+
+    def tearDown(self):
+        defaults.NUMPY_BUCKETING = self.original_numpy_bucketing
+        super(NumpyBucketingMixin, self).tearDown()
+
+    def bucketing_modes(self):
+        """Set ``defaults.NUMPY_BUCKETING`` to each value in turn."""
+        for use_numpy in (False, True):
+            defaults.NUMPY_BUCKETING = use_numpy
+            yield use_numpy
+
+
+class TestOccurrenceIndex(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.starts = [make_datetime(1982, 8, d, h) for d in (20, 1, 17, 31)
+                       for h in (0, 12, 23)]
+        self.occurrences = [FakeOccurrence(s) for s in self.starts]
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_sorted_by_start(self):
+        index = OccurrenceIndex(self.occurrences)
+        assert_equal([o.start for o in index], sorted(self.starts))
+        assert_equal(len(index), len(self.starts))
+
+    def test_between(self):
+        index = OccurrenceIndex(self.occurrences)
+        day = index.between(make_datetime(1982, 8, 17),
+                            make_datetime(1982, 8, 18) - timedelta.resolution)
+        assert_equal([o.start for o in day],
+                     [make_datetime(1982, 8, 17, h) for h in (0, 12, 23)])
+        assert_false(index.between(make_datetime(1982, 8, 2),
+                                   make_datetime(1982, 8, 16)))
+
+    def test_between_narrows_within_parent_window(self):
+        index = OccurrenceIndex(self.occurrences)
+        first = index.between(make_datetime(1982, 8, 1),
+                              make_datetime(1982, 8, 1, 12))
+        assert_equal(len(first), 2)
+        assert_equal(len(first.between(make_datetime(1982, 8, 1),
+                                       make_datetime(1982, 8, 31))), 2)
+
+    def test_coerce(self):
+        index = OccurrenceIndex(self.occurrences)
+        assert index is OccurrenceIndex.coerce(index)
+        assert_equal(len(OccurrenceIndex.coerce(self.occurrences)),
+                     len(self.occurrences))
+        assert_false(OccurrenceIndex.coerce(None))
+
+    def test_index_shared_by_child_periods(self):
+        month = Month(date(1982, 8, 1), occurrences=self.occurrences)
+        assert_equal(len(month.occurrences), len(self.occurrences))
+        for week in month.weeks:
+            assert week.occurrence_index._items is month.occurrence_index._items
+            for day in week.days:
+                assert_equal(day.occurrences,
+                             [o for o in self.occurrences if o.start in day])
+
+
+class TestOverlappingOccurrences(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.conference = FakeOccurrence(make_datetime(1982, 8, 16, 9),
+                                         make_datetime(1982, 8, 18, 17))
+        self.lunch = FakeOccurrence(make_datetime(1982, 8, 17, 12),
+                                    make_datetime(1982, 8, 17, 13))
+        self.midnight = FakeOccurrence(make_datetime(1982, 8, 19, 22),
+                                       make_datetime(1982, 8, 20))
+        self.occurrences = [self.lunch, self.midnight, self.conference]
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_start_only_by_default(self):
+        days = Week(date(1982, 8, 16), occurrences=self.occurrences).days
+        assert_equal([d.occurrences for d in days], [
+            [self.conference], [self.lunch], [], [self.midnight], [], [], []
+        ])
+
+    def test_overlap_mode(self):
+        week = Week(date(1982, 8, 16), occurrences=self.occurrences,
+                    overlap=True)
+        assert_equal([d.occurrences for d in week.days], [
+            [self.conference], [self.conference, self.lunch],
+            [self.conference], [self.midnight], [], [], []
+        ])
+        day = week.days[1]
+        assert_equal([h.occurrences for h in day.hours][11:14], [
+            [self.conference], [self.conference, self.lunch],
+            [self.conference]
+        ])
+
+    def test_overlap_mode_spanning_periods(self):
+        month = Month(date(1982, 8, 1), occurrences=self.occurrences,
+                      overlap=True)
+        assert month.occurrence_index.overlap
+        assert_equal(len(month.occurrences), 3)
+        busy = [d.day for d in month.days if d.occurrences]
+        assert_equal(busy, [16, 17, 18, 19])
+
+    def test_overlap_index_counts(self):
+        index = OccurrenceIndex(self.occurrences, overlap=True)
+        wednesday = index.between(make_datetime(1982, 8, 18),
+                                  make_datetime(1982, 8, 19) -
+                                  timedelta.resolution)
+        assert_equal(len(wednesday), 1)
+        assert wednesday
+        friday = index.between(make_datetime(1982, 8, 20),
+                               make_datetime(1982, 8, 21))
+        assert_equal(len(friday), 0)
+        assert_false(friday)
+
+    def test_long_occurrence_does_not_widen_windows(self):
+        start = make_datetime(1982, 1, 1)
+        short = [FakeOccurrence(start + timedelta(hours=i),
+                                start + timedelta(hours=i, minutes=30))
+                 for i in range(24 * 300)]
+        year_long = FakeOccurrence(start, start + timedelta(days=395))
+        index = OccurrenceIndex(short + [year_long], overlap=True)
+        day = index.between(make_datetime(1982, 10, 1),
+                            make_datetime(1982, 10, 2) -
+                            timedelta.resolution)
+        assert_equal(len(day), 25)
+        assert_equal(day[0], year_long)
+        # Only the occurrences in the day are scanned, not every short one
+        # since the start of the long one.
+        assert sum(hi - lo for lo, hi in day._windows) <= 26
+
+
+class TestPeriodCache(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.occurrences = [FakeOccurrence(make_datetime(1982, 8, d, 12))
+                            for d in (1, 17, 31)]
+        self.cache = PeriodCache(self.occurrences)
+        self.month = self.cache.get(Month, date(1982, 8, 17))
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_child_periods_memoized(self):
+        assert self.month.weeks is self.month.weeks
+        assert self.month.days is self.month.days
+        week = self.month.weeks[2]
+        assert week.days is week.days
+        assert week.days[0].hours is week.days[0].hours
+        plain = Month(date(1982, 8, 17))
+        assert plain.weeks is plain.weeks
+
+    def test_get_returns_built_periods(self):
+        assert self.cache.get(Month, date(1982, 8, 1)) is self.month
+        assert self.cache.get(Month, make_datetime(1982, 8, 31, 23)) is self.month
+        for week in self.month.weeks:
+            for day in week.days:
+                assert day.get_week() is week
+                if day.month == 8:
+                    assert day.get_month() is self.month
+        assert self.month.weeks[3].days[1] is self.month.days[16]
+
+    def test_cached_periods_share_occurrences(self):
+        day = self.month.days[16]
+        assert_equal(day.occurrences, [self.occurrences[1]])
+        assert_equal(day.get_month().occurrences, self.occurrences)
+        assert_equal(self.month.weeks[0].occurrences, [self.occurrences[0]])
+
+    def test_key_includes_class(self):
+        week = self.cache.get(Week, date(1982, 8, 16))
+        day = self.cache.get(Day, date(1982, 8, 16))
+        assert week is not day
+        assert isinstance(week, Week)
+        assert isinstance(day, Day)
+
+
+class TestPeriodSkeletons(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_identical_periods_share_skeleton(self):
+        day = Day(date(1982, 8, 17))
+        other = Day(make_datetime(1982, 8, 17))
+        assert day._skeleton is Day(date(1982, 8, 17))._skeleton
+        assert day is not other
+        assert_equal(day.start, other.start)
+        assert_equal(day.finish, other.finish)
+        assert day._skeleton is not Week(date(1982, 8, 17))._skeleton
+
+    def test_key_includes_time_zone(self):
+        paris = timezone.pytz.timezone('Europe/Paris')
+        dt = make_datetime(1982, 8, 17, 23, tzinfo=timezone.utc)
+        utc_day = Day(dt)
+        paris_day = Day(dt.astimezone(paris))
+        assert_equal(utc_day.day, 17)
+        assert_equal(paris_day.day, 18)
+        with timezone.override(paris):
+            assert_equal(Day(date(1982, 8, 17)).start.tzinfo.zone,
+                         'Europe/Paris')
+        assert_equal(Day(date(1982, 8, 17)).start.tzinfo.zone,
+                     timezone.get_current_timezone_name())
+
+    def test_key_includes_first_weekday(self):
+        assert_equal(Week(date(1982, 8, 17)).weekday(), calendar.MONDAY)
+        translation.activate('en-us')
+        assert_equal(Week(date(1982, 8, 17)).weekday(), calendar.SUNDAY)
+
+    def test_least_recently_used_evicted(self):
+        skeletons = PeriodSkeletons(maxsize=2)
+        first = skeletons.get(Day, date(1982, 8, 1))
+        second = skeletons.get(Day, date(1982, 8, 2))
+        assert skeletons.get(Day, date(1982, 8, 1)) is first
+        skeletons.get(Day, date(1982, 8, 3))
+        assert_equal(len(skeletons), 2)
+        assert skeletons.get(Day, date(1982, 8, 1)) is first
+        assert skeletons.get(Day, date(1982, 8, 2)) is not second
+
+    def test_disabled(self):
+        skeletons = PeriodSkeletons(maxsize=0)
+        assert (skeletons.get(Day, date(1982, 8, 1)) is not
+                skeletons.get(Day, date(1982, 8, 1)))
+        assert_equal(len(skeletons), 0)
+
+    def test_periods_hashable(self):
+        days = dict((day, day.day) for day in Month(date(1982, 8, 1)).days)
+        assert_equal(days[Day(date(1982, 8, 17))], 17)
+        assert Day(date(1982, 8, 17)) in set([Day(make_datetime(1982, 8, 17))])
+        # Equal, but not found under the day.
+        assert_equal(Day(date(1982, 8, 17)), make_datetime(1982, 8, 17, 12))
+        assert make_datetime(1982, 8, 17, 12) not in days
+
+    def test_periods_of_different_classes_differ(self):
+        start = date(1982, 11, 1)   # a Monday
+        day, week, month = Day(start), Week(start), Month(start)
+        assert_equal(day.start, week.start)
+        assert_equal(day.start, month.start)
+        assert_equal(len(set([day, week, month, Day(start), Month(start)])), 3)
+        january = date(1982, 1, 1)
+        assert_equal(len(dict((period, 1) for period in
+                              (Year(january), Day(january)))), 2)
+        assert day != month and month != day
+        assert Day(date(1982, 11, 9)) != month
+        assert month != Day(date(1982, 11, 9))
+        tokyo = timezone.pytz.timezone('Asia/Tokyo')
+        assert day != Day(tokyo.localize(datetime(1982, 11, 1)))
+        assert_equal(sorted([month, Day(date(1982, 10, 31)), day]),
+                     [Day(date(1982, 10, 31)), day, month])
+
+    def test_thread_safe(self):
+        skeletons = PeriodSkeletons(maxsize=16)
+        errors = []
+
+        def lookup(offset):
+            try:
+                for i in range(200):
+                    day = date(1982, 1, 1) + timedelta(days=(i + offset) % 40)
+                    assert_equal(skeletons.get(Day, day).start.date(), day)
+            except Exception, e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lookup, args=(i,))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_equal(errors, [])
+        assert_equal(len(skeletons), 16)
+
+
+class TestBusyBitmap(NumpyBucketingMixin, TestCase):
+    def setUp(self):
+        super(TestBusyBitmap, self).setUp()
+        translation.activate('en-gb')
+        self.occurrences = [
+            FakeOccurrence(make_datetime(1982, 8, 1, 12)),
+            FakeOccurrence(make_datetime(1982, 8, 16, 23, 30),
+                           make_datetime(1982, 8, 18, 1)),
+            FakeOccurrence(make_datetime(1982, 8, 31, 23, 59)),
+            FakeOccurrence(make_datetime(1982, 9, 1)),
+        ]
+
+    def tearDown(self):
+        translation.deactivate()
+        super(TestBusyBitmap, self).tearDown()
+
+    def test_bitmap(self):
+        for use_numpy in self.bucketing_modes():
+            month = Month(date(1982, 8, 1), occurrences=self.occurrences)
+            assert_equal(month.busy_bitmap, 1 | 1 << 15 | 1 << 30)
+            month = Month(date(1982, 8, 1), occurrences=self.occurrences,
+                          overlap=True)
+            assert_equal(month.busy_bitmap,
+                         1 | 1 << 15 | 1 << 16 | 1 << 17 | 1 << 30)
+            assert_equal(Month(date(1982, 7, 1)).busy_bitmap, 0)
+
+    def test_days_match_occurrences(self):
+        for overlap in (False, True):
+            cache = PeriodCache(self.occurrences, overlap=overlap)
+            year = cache.get(Year, date(1982, 1, 1))
+            for month in year.months:
+                for day in month.days:
+                    assert_equal(day.is_busy, bool(day.occurrences))
+                    assert_equal(month.is_busy_on(day), day.is_busy)
+
+    def test_without_period_cache(self):
+        day = Day(date(1982, 8, 16), occurrences=self.occurrences)
+        assert day.is_busy
+        assert not Day(date(1982, 8, 17), occurrences=self.occurrences).is_busy
+        assert Month(date(1982, 9, 1), occurrences=self.occurrences).is_busy
+
+
+class TestDayCounts(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.cache = PeriodCache(day_counts={
+            date(1982, 8, 16): {'published': 2, 'cancelled': 1},
+            date(1982, 8, 31): {'published': 1},
+            date(1982, 9, 1): {'published': 4},
+        })
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_counts(self):
+        month = self.cache.get(Month, date(1982, 8, 1))
+        assert_equal(month.occurrences, [])
+        assert_equal(month.occurrence_count, 4)
+        assert_equal(month.status_counts, {'published': 3, 'cancelled': 1})
+        assert_equal(month.days[15].occurrence_count, 3)
+        assert_equal(month.days[16].occurrence_count, 0)
+        assert_equal(self.cache.get(Year, date(1982, 1, 1)).occurrence_count, 8)
+        assert_equal(Month(date(1982, 8, 1)).status_counts, None)
+
+    def test_busy(self):
+        month = self.cache.get(Month, date(1982, 8, 1))
+        assert_equal(month.busy_bitmap, 1 << 15 | 1 << 30)
+        assert month.days[15].is_busy
+        assert not month.days[16].is_busy
+        assert not self.cache.get(Month, date(1982, 7, 1)).is_busy
+
+
+class TestAggregates(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        at = lambda day, hour, minute=0: make_datetime(1982, 8, day, hour,
+                                                       minute)
+        self.occurrences = [
+            FakeOccurrence(at(16, 9), at(16, 11)),
+            FakeOccurrence(at(16, 10), at(16, 12)),
+            FakeOccurrence(at(16, 10, 30), at(16, 10, 45)),
+            FakeOccurrence(at(16, 12), at(16, 13)),   # touches the second
+            FakeOccurrence(at(16, 15), at(16, 15)),   # no duration
+            FakeOccurrence(at(16, 22), at(17, 2)),    # runs past midnight
+        ]
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_day(self):
+        day = Day(date(1982, 8, 16), occurrences=self.occurrences)
+        assert_equal(day.count, 6)
+        assert_equal(day.busy_duration, timedelta(hours=6))
+        assert_equal(day.max_concurrency, 3)
+        assert_equal(day.utilisation, 0.25)
+
+    def test_overlap(self):
+        day = Day(date(1982, 8, 17), occurrences=self.occurrences,
+                  overlap=True)
+        assert_equal(day.count, 1)
+        assert_equal(day.busy_duration, timedelta(hours=2))
+        assert_equal(day.max_concurrency, 1)
+        week = Week(date(1982, 8, 16), occurrences=self.occurrences)
+        assert_equal(week.busy_duration, timedelta(hours=8))
+        assert_equal(week.utilisation, 8 / (7 * 24.0))
+
+    def test_empty(self):
+        day = Day(date(1982, 8, 18), occurrences=self.occurrences)
+        assert_equal(day.count, 0)
+        assert_equal(day.busy_duration, timedelta(0))
+        assert_equal(day.max_concurrency, 0)
+        assert_equal(day.utilisation, 0)
+
+
+class TestEpochComparisons(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.day = Day(date(1982, 8, 17))
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_epoch_bounds(self):
+        assert_equal(self.day.epoch_bounds,
+                     (epoch_microseconds(self.day.start),
+                      epoch_microseconds(self.day.finish)))
+        assert Day(date(1982, 8, 17)).epoch_bounds is self.day.epoch_bounds
+
+    def test_contains_instants(self):
+        paris = timezone.pytz.timezone('Europe/Paris')
+        late = paris.localize(datetime(1982, 8, 16, 23, 30))
+        late_utc = late.astimezone(timezone.utc)     # 21:30 on the 16th
+        assert late not in self.day
+        assert late_utc not in self.day
+        early_utc = paris.localize(datetime(1982, 8, 17, 1)).astimezone(
+            timezone.utc
+        )                                            # 23:00 on the 16th
+        assert early_utc in self.day
+        assert early_utc in self.day.get_week()
+        assert self.day.finish in self.day
+        assert self.day.finish + timedelta.resolution not in self.day
+        assert date(1982, 8, 17) in self.day
+        assert 'not a date' not in self.day
+
+    def test_cmp_instants(self):
+        noon = make_datetime(1982, 8, 17, 12)
+        assert_equal(self.day, noon)
+        assert self.day < noon + timedelta(1)
+        assert self.day > noon - timedelta(1)
+        assert self.day in self.day.get_month()
+        assert_equal(Period(noon), noon)
+        assert Period(noon) < noon + timedelta(1)
+
+
+class TestLazyChildren(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.occurrences = [FakeOccurrence(make_datetime(1982, 8, 17, h, 30))
+                            for h in (9, 9, 14)]
+        self.day = Day(date(1982, 8, 17), occurrences=self.occurrences)
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_hours_built_when_used(self):
+        hours = self.day.hours
+        assert_equal(len(hours), 24)
+        assert_equal(hours._items.count(None), 24)
+        assert_equal(hours[9].occurrences, self.occurrences[:2])
+        assert hours[9] is hours[9]
+        assert_equal(hours[-1].hour, 23)
+        assert_equal(hours._items.count(None), 22)
+        assert_equal([h.hour for h in hours[2:5]], [2, 3, 4])
+        assert_raises(IndexError, lambda: hours[24])
+
+    def test_minutes(self):
+        hour = self.day.hours[9]
+        minutes = hour.minutes
+        assert_equal(len(minutes), 60)
+        assert_equal(minutes[30], make_datetime(1982, 8, 17, 9, 30))
+        assert_equal(list(hour)[-1], make_datetime(1982, 8, 17, 9, 59))
+
+    def test_non_empty(self):
+        hours = self.day.non_empty(Hour)
+        assert_equal([h.hour for h in hours], [9, 14])
+        assert_equal(hours[0].occurrences, self.occurrences[:2])
+        assert_equal(self.day.hours._items.count(None), 24)
+        assert_equal(Day(date(1982, 8, 18)).non_empty(Hour), [])
+        month = Month(date(1982, 8, 1), occurrences=self.occurrences)
+        assert_equal(month.non_empty(Day), [self.day])
+        assert_equal(month.non_empty(Week), [Week(date(1982, 8, 16))])
+
+
+class TestBucketing(NumpyBucketingMixin, TestCase):
+    def setUp(self):
+        super(TestBucketing, self).setUp()
+        translation.activate('en-gb')
+        start = make_datetime(2013, 1, 1)
+        self.occurrences = [
+            FakeOccurrence(start + timedelta(hours=i * 37 % 9000),
+                           start + timedelta(hours=i * 37 % 9000 + i % 50))
+            for i in range(300)
+        ]
+
+    def tearDown(self):
+        translation.deactivate()
+        super(TestBucketing, self).tearDown()
+
+    def _day_occurrences(self, overlap):
+        year = Year(date(2013, 1, 1), occurrences=self.occurrences,
+                    overlap=overlap)
+        return [(day.start, day.occurrences) for month in year.months
+                for week in month.weeks for day in week.days
+                if day.month == month.month]
+
+    def _test_year_buckets(self, overlap):
+        expected = [
+            (d.start, d.occurrences) for d in
+            Year(date(2013, 1, 1), occurrences=self.occurrences,
+                 overlap=overlap).days
+        ]
+        for use_numpy in self.bucketing_modes():
+            actual = dict(self._day_occurrences(overlap))
+            for start, occurrences in expected:
+                assert_equal(actual[start], occurrences)
+
+    def test_year_buckets(self):
+        self._test_year_buckets(overlap=False)
+
+    def test_year_buckets_overlap(self):
+        self._test_year_buckets(overlap=True)
+
+    def test_windows_match_without_numpy(self):
+        if bucketing.numpy is None:
+            return
+        boundaries = Day.boundaries(make_datetime(2013, 1, 1),
+                                    make_datetime(2013, 12, 31))
+        for overlap in (False, True):
+            index = OccurrenceIndex(self.occurrences, overlap=overlap)
+            index = index.between(make_datetime(2013, 2, 1),
+                                  make_datetime(2013, 11, 1))
+            for run, (lo, hi) in zip(index._runs, index._windows):
+                args = (run, lo, hi, overlap, boundaries)
+                assert_equal(bucketing._numpy_windows(*args),
+                             bucketing._python_windows(*args))
+                assert_equal(bucketing._merged_windows(*args),
+                             bucketing._python_windows(*args))
+
+    def test_boundaries(self):
+        bounds = Week.boundaries(make_datetime(2013, 1, 1),
+                                 make_datetime(2013, 1, 31))
+        assert_equal(bounds, [make_datetime(2012, 12, 31) + timedelta(7 * i)
+                              for i in range(6)])
+
+
+class TestTimeslotGrid(NumpyBucketingMixin, TestCase):
+    def setUp(self):
+        super(TestTimeslotGrid, self).setUp()
+        translation.activate('en-gb')
+        start = make_datetime(1982, 8, 16)
+        self.occurrences = [
+            FakeOccurrence(start + timedelta(minutes=i * 53),
+                           start + timedelta(minutes=i * 53 + i % 7 * 20 + 5))
+            for i in range(200)
+        ]
+
+    def tearDown(self):
+        translation.deactivate()
+        super(TestTimeslotGrid, self).tearDown()
+
+    def _expected(self, interval, overlap):
+        if overlap:
+            return [o for o in self.occurrences if o.start <= interval.finish
+                    and o.finish > interval.start]
+        return [o for o in self.occurrences if o.start in interval]
+
+    def test_calendar_display(self):
+        for use_numpy in self.bucketing_modes():
+            for overlap in (False, True):
+                week = Week(date(1982, 8, 16), occurrences=self.occurrences,
+                            overlap=overlap)
+                rows = week.calendar_display
+                assert_equal(len(rows), len(week.days[0].intervals))
+                for row in rows:
+                    assert_equal(len(row), 7)
+                    for interval in row:
+                        assert_equal(interval.occurrences,
+                                     self._expected(interval, overlap))
+
+    def test_intervals_are_day_intervals(self):
+        intervals = Day(date(1982, 8, 17)).intervals
+        assert all(isinstance(i, DayInterval) for i in intervals)
+        assert_equal(intervals[1].start - intervals[0].start,
+                     defaults.TIMESLOT_INTERVAL)
+        assert_equal(intervals[0].get_day(), date(1982, 8, 17))
+
+    def test_intervals_on_dst_transition(self):
+        intervals = Day(date(2013, 3, 31)).intervals
+        start_time = defaults.TIMESLOT_START_TIME
+        assert_equal(intervals[0].start,
+                     make_datetime(2013, 3, 31, start_time.hour,
+                                   start_time.minute))
+
+
 class TestDateTimeProxiesWithLocalizedOccurrences(TestCase):
     def setUp(self):
         deactivate_default_occurrence_validators()
@@ -732,6 +1443,192 @@ class TestDateTimeProxiesWithLocalizedOccurrences(TestCase):
         assert_equal(len(self.week.occurrences), 2)
 
 
+class TestPeriodRange(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.occurrences = staggered_occurrences()
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_periods(self):
+        days = list(PeriodRange(date(1982, 8, 16), date(1983, 2, 3), Day))
+        assert_equal(days[0], Day(date(1982, 8, 16)))
+        assert_equal(days[-1], Day(date(1983, 2, 3)))
+        assert_equal(len(days), 172)
+        weeks = list(PeriodRange(date(1982, 8, 18), date(1982, 9, 1), Week))
+        assert_equal(weeks, [Week(date(1982, 8, 16)), Week(date(1982, 8, 23)),
+                             Week(date(1982, 8, 30))])
+        months = list(PeriodRange(date(1982, 8, 18), date(1984, 1, 1), Month))
+        assert_equal(len(months), 18)
+
+    def test_occurrence_slices(self):
+        for unit in (Day, Week, Month):
+            for overlap in (False, True):
+                periods = PeriodRange(date(1982, 8, 16), date(1982, 11, 30),
+                                      unit, iter(self.occurrences), overlap)
+                for period in periods:
+                    expected = unit(period.start, occurrences=self.occurrences,
+                                    overlap=overlap)
+                    assert_equal(period.occurrences, expected.occurrences)
+
+    def test_queryset(self):
+        deactivate_default_occurrence_validators()
+        try:
+            user = User.objects.create_user('TestyMcTesterson')
+            calendar = Calendar.objects.create(name='Basic', slug='basic')
+            event = Event.objects.create(name='Event', slug='event',
+                                         creator=user)
+            for o in reversed(self.occurrences[:50]):
+                Occurrence.objects.create(calendar=calendar, event=event,
+                                          start=o.start, finish=o.finish)
+        finally:
+            activate_default_occurrence_validators()
+        days = PeriodRange(date(1982, 8, 15), date(1982, 8, 31), Day,
+                           Occurrence.objects.all())
+        counts = [len(day.occurrences) for day in days]
+        # The first occurrence starts on the 14th.
+        assert_equal(sum(counts), 49)
+        assert_equal(counts[:3], [3, 4, 3])
+
+        # Occurrences outside the range aren't read at all.
+        for overlap in (False, True):
+            days = PeriodRange(date(1982, 8, 16), date(1982, 8, 20), Day,
+                               Occurrence.objects.all(), overlap)
+            assert_equal(len(list(days._cursor())), 19 if overlap else 17)
+
+
+class TestSlidingWindow(TestCase):
+    def setUp(self):
+        translation.activate('en-gb')
+        self.occurrences = staggered_occurrences()
+        self.fetched = []
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def fetch(self, start, finish):
+        self.fetched.append((start, finish))
+        return [o for o in self.occurrences if start <= o.start <= finish]
+
+    def test_shift(self):
+        window = SlidingWindow(date(1982, 8, 16), Day, 7, self.fetch)
+        assert_equal(len(self.fetched), 1)
+        assert_equal(window.start, make_datetime(1982, 8, 16))
+        assert_equal(window.finish, Day(date(1982, 8, 22)).finish)
+        moved = window.next().next().shift(3).previous()
+        assert_equal(len(self.fetched), 5)
+        assert_equal(self.fetched[-1], (make_datetime(1982, 8, 20),
+                                        Day(date(1982, 8, 20)).finish))
+        assert moved[1] is window[5]
+        fresh = SlidingWindow(date(1982, 8, 20), Day, 7, self.occurrences)
+        assert_equal(list(moved), list(fresh))
+        for period, expected in zip(moved, fresh):
+            assert_equal(period.occurrences, expected.occurrences)
+        assert_equal(moved.occurrences, fresh.occurrences)
+        assert_equal(len(window.shift(-7)), 7)
+        assert_equal(len(self.fetched), 6)
+
+    def test_overlap(self):
+        window = SlidingWindow(date(1982, 8, 16), Week, 4, self.occurrences,
+                               overlap=True)
+        window = window.next()
+        for week in window:
+            expected = Week(week.start, occurrences=self.occurrences,
+                            overlap=True)
+            assert_equal(week.occurrences, expected.occurrences)
+        occurrences = window.occurrences
+        assert_equal(len(occurrences), len(set(occurrences)))
+
+    def test_queryset(self):
+        deactivate_default_occurrence_validators()
+        try:
+            user = User.objects.create_user('TestyMcTesterson')
+            calendar = Calendar.objects.create(name='Basic', slug='basic')
+            event = Event.objects.create(name='Event', slug='event',
+                                         creator=user)
+            for o in self.occurrences[:50]:
+                Occurrence.objects.create(calendar=calendar, event=event,
+                                          start=o.start, finish=o.finish)
+        finally:
+            activate_default_occurrence_validators()
+        with self.assertNumQueries(1):
+            window = SlidingWindow(date(1982, 8, 15), Day, 3,
+                                   Occurrence.objects.all())
+        with self.assertNumQueries(1):
+            window = window.next()
+        assert_equal([len(day.occurrences) for day in window], [4, 3, 3])
+
+
+class TestPeriodSerialization(TestCase):
+    def setUp(self):
+        deactivate_default_occurrence_validators()
+        translation.activate('en-gb')
+        user = User.objects.create_user('TestyMcTesterson')
+        self.calendar = Calendar.objects.create(name='Basic', slug='basic')
+        self.event = Event.objects.create(name='The Event', slug='the-event',
+                                          creator=user)
+        for day, hour in ((1, 9), (16, 23), (17, 12), (31, 23)):
+            start = make_datetime(1982, 8, day, hour, 30)
+            Occurrence.objects.create(calendar=self.calendar, event=self.event,
+                                      start=start,
+                                      finish=start + timedelta(hours=2))
+        self.month = PeriodCache(
+            Occurrence.objects.select_related('event')
+        ).get(Month, date(1982, 8, 1))
+
+    def tearDown(self):
+        activate_default_occurrence_validators()
+        translation.deactivate()
+
+    def test_round_trip(self):
+        data = pickle.loads(pickle.dumps(dump_period(self.month), -1))
+        with self.assertNumQueries(0):
+            month = load_period(data)
+            assert isinstance(month, Month)
+            assert_equal(month, self.month)
+            assert_equal(month.finish, self.month.finish)
+            for week, expected in zip(month.weeks, self.month.weeks):
+                for day, expected_day in zip(week.days, expected.days):
+                    assert_equal([(o.pk, o.start, o.finish)
+                                  for o in day.occurrences],
+                                 [(o.pk, o.start, o.finish)
+                                  for o in expected_day.occurrences])
+        o, expected = month.occurrences[0], self.month.occurrences[0]
+        assert_equal(o.event.name, 'The Event')
+        assert_equal(o.event.slug, 'the-event')
+        assert_equal(o.get_absolute_url(), expected.get_absolute_url())
+        assert_equal(o.status_slug, expected.status_slug)
+        assert_equal(o.get_status_display(), expected.get_status_display())
+        assert_equal(o.start.tzinfo.zone, self.month.start.tzinfo.zone)
+
+    def test_compact(self):
+        data = dump_period(self.month)
+        assert_equal(data[2], epoch_microseconds(self.month.start))
+        assert_equal(len(data[-1]), 4)
+        assert all(isinstance(value, (int, long, basestring, type(None)))
+                   for o in data[-1] for value in o)
+
+    def test_version_checked(self):
+        data = (0,) + dump_period(self.month)[1:]
+        assert_raises(ValueError, load_period, data)
+
+    def test_week_keeps_its_start(self):
+        week = self.month.weeks[2]
+        data = dump_period(week)
+        translation.activate('en-us')
+        loaded = load_period(data)
+        assert_equal(loaded.start, week.start)
+        assert_equal(loaded.weekday(), calendar.MONDAY)
+        assert_equal(loaded.finish, week.finish)
+        assert_equal([o.pk for o in loaded.occurrences],
+                     [o.pk for o in week.occurrences])
+
+    def test_pytz_time_zone_required(self):
+        month = Month(datetime(1982, 8, 1, tzinfo=FixedOffset(60)))
+        assert_raises(ValueError, dump_period, month)
+
+
 class TestWeeksAttribute(TestCase):
     def setUp(self):
         translation.activate('en-gb')
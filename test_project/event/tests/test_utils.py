@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from django.test import TestCase
+from django.utils import timezone
+from nose.tools import *
+
+from calendartools.utils import make_datetime, get_local_tzinfo
+
+
+class TestMakeDatetime(TestCase):
+    zones = ('UTC', 'Europe/Paris', 'America/New_York', 'Australia/Sydney',
+             'Asia/Kolkata')
+
+    def test_same_as_make_aware(self):
+        for zone in self.zones:
+            tzinfo = pytz.timezone(zone)
+            dt = datetime(2013, 1, 1)
+            while dt.year == 2013:
+                try:
+                    expected = timezone.make_aware(dt, tzinfo)
+                except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError):
+                    dt += timedelta(minutes=30)
+                    continue
+                actual = make_datetime(dt.year, dt.month, dt.day, dt.hour,
+                                       dt.minute, tzinfo=tzinfo)
+                assert_equal(actual, expected)
+                assert_equal(actual.utcoffset(), expected.utcoffset())
+                assert actual.tzinfo is expected.tzinfo
+                dt += timedelta(minutes=30)
+
+    def test_current_time_zone(self):
+        with timezone.override(pytz.timezone('America/New_York')):
+            dt = make_datetime(2013, 7, 1, 9)
+        assert_equal(dt.tzinfo.zone, 'America/New_York')
+        assert_equal(dt.utcoffset(), timedelta(hours=-4))
+
+    def test_transition_days_localized(self):
+        paris = pytz.timezone('Europe/Paris')
+        assert_equal(get_local_tzinfo(paris, 2013, 3, 31), None)
+        assert_equal(get_local_tzinfo(paris, 2013, 10, 27), None)
+        assert_raises(pytz.NonExistentTimeError, make_datetime,
+                      2013, 3, 31, 2, 30, tzinfo=paris)
+        assert_raises(pytz.AmbiguousTimeError, make_datetime,
+                      2013, 10, 27, 2, 30, tzinfo=paris)
+        assert_equal(make_datetime(2013, 3, 31, 3, tzinfo=paris).utcoffset(),
+                     timedelta(hours=2))
+
+    def test_offset_cached_per_day(self):
+        paris = pytz.timezone('Europe/Paris')
+        summer = get_local_tzinfo(paris, 2013, 7, 1)
+        assert_equal(datetime(2013, 7, 1, tzinfo=summer).utcoffset(),
+                     timedelta(hours=2))
+        assert get_local_tzinfo(paris, 2013, 7, 1) is summer
+        assert_equal(get_local_tzinfo(timezone.utc, 2013, 7, 1), timezone.utc)
@@ -1,7 +1,11 @@
 from datetime import date, timedelta
+import json
+
 from dateutil.relativedelta import relativedelta
+import pytz
 
 from django.contrib.auth.models import User, Permission
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -11,6 +15,7 @@ from event.models import (
     Calendar, Event, Occurrence, Attendance
 )
 from calendartools import defaults, signals, views
+from calendartools.periods import Month
 from calendartools.forms import (
     EventForm,
     MultipleOccurrenceForm,
@@ -933,6 +938,143 @@ class TestCalendarViews(TestCase):
             response = self.client.get(url, follow=True)
             assert_equal(response.context[-1].get('object_list').count(), amount)
 
+    def test_overlapping_occurrences(self):
+        start = self.base_datetime - relativedelta(days=2)
+        Occurrence.objects.create(calendar=self.calendar, event=self.event,
+                                  start=start, finish=start + timedelta(3))
+        url = self.urls[-1] # day-calendar
+        response = self.client.get(url, follow=True)
+        assert_equal(len(response.context[-1].get('day').occurrences), 1)
+
+        views.base.CalendarViewBase.overlapping_occurrences = True
+        try:
+            response = self.client.get(url, follow=True)
+        finally:
+            views.base.CalendarViewBase.overlapping_occurrences = False
+        assert_equal(len(response.context[-1].get('day').occurrences), 2)
+
+    def test_year_day_counts(self):
+        views.calendars.YearView.day_counts_only = True
+        try:
+            response = self.client.get(self.urls[0], follow=True)
+        finally:
+            views.calendars.YearView.day_counts_only = False
+        year = response.context[-1].get('year')
+        assert_equal(year.occurrences, [])
+        assert_equal(year.occurrence_count, 6)
+        day = year.months[0].days[6]
+        assert day.is_busy
+        assert_equal(day.occurrence_count, 1)
+        assert not year.months[0].days[5].is_busy
+        assert_equal(year.months[0].occurrence_count, 3)
+        self.assertContains(response, 'data-count="1"', count=6)
+
+    def test_query_budget(self):
+        self.client.logout()
+        # Warm the site cache used by the current_site context processor, and
+        # the calendar's bounds.
+        self.client.get(self.urls[0], follow=True)
+        budget = views.base.CalendarViewBase.query_budget
+        for url in self.urls:
+            with self.assertNumQueries(budget):
+                response = self.client.get(url, follow=True)
+            # The occurrences were fetched once, and are counted from there.
+            with self.assertNumQueries(0):
+                response.context[-1].get('object_list').count()
+            assert_equal(response.context[-1].get('calendar'), self.calendar)
+
+        # Without occurrences to bring it along, the calendar is looked up.
+        url = reverse('month-calendar', kwargs={
+            'slug': self.calendar.slug, 'year': self.base_datetime.year,
+            'month': 'dec'
+        })
+        with self.assertNumQueries(budget + 1):
+            response = self.client.get(url, follow=True)
+        assert_equal(response.context[-1].get('calendar'), self.calendar)
+
+    def test_page_cache(self):
+        cache.clear()
+        self.client.logout()
+        url = self.urls[3] # month-calendar
+        views.base.CalendarViewBase.page_cache_timeout = 60
+        try:
+            response = self.client.get(url)
+            assert_equal(response.context[-1].get('object_list').count(), 3)
+            with self.assertNumQueries(0):
+                cached = self.client.get(url)
+            assert_equal(cached.content, response.content)
+
+            # Other query strings are other pages.
+            response = self.client.get(url + '?timezone=Asia/Tokyo')
+            assert response.context
+
+            # Pages filtered on the current time are rendered every time.
+            self.client.get(url + '?period=future')
+            response = self.client.get(url + '?period=future')
+            assert response.context
+
+            # Writes to the calendar bump its generation.
+            dt = self.base_datetime + relativedelta(days=2)
+            Occurrence.objects.create(calendar=self.calendar, event=self.event,
+                                      start=dt, finish=dt + timedelta(hours=1))
+            response = self.client.get(url)
+            assert_equal(response.context[-1].get('object_list').count(), 4)
+
+            # Users who can see hidden items get their own copy.
+            self.user.is_staff = True
+            self.user.save()
+            self.client.login(username=self.user.username, password='password')
+            response = self.client.get(url)
+            assert response.context
+        finally:
+            views.base.CalendarViewBase.page_cache_timeout = 0
+
+    def test_conditional_get(self):
+        views.base.CalendarViewBase.conditional_get = True
+        try:
+            self._test_conditional_get()
+        finally:
+            views.base.CalendarViewBase.conditional_get = False
+
+    def test_conditional_get_disabled(self):
+        self.client.logout()
+        response = self.client.get(self.urls[3])
+        assert not response.has_header('ETag')
+        assert not response.has_header('Last-Modified')
+
+    def _test_conditional_get(self):
+        self.client.logout()
+        url = self.urls[3] # month-calendar
+        response = self.client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert_equal(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert_equal(response.status_code, 304)
+        response = self.client.get(self.urls[4], HTTP_IF_NONE_MATCH=etag)
+        assert_equal(response.status_code, 200)
+
+        dt = self.base_datetime + relativedelta(days=2)
+        Occurrence.objects.create(calendar=self.calendar, event=self.event,
+                                  start=dt, finish=dt + timedelta(hours=1))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert_equal(response.status_code, 200)
+        assert_not_equal(response['ETag'], etag)
+
+        # Pages filtered on the current time have no validators.
+        response = self.client.get(url + '?period=future')
+        assert not response.has_header('ETag')
+        assert not response.has_header('Last-Modified')
+
+        # Nor have those of logged in users a Last-Modified time.
+        self.client.login(username=self.user.username, password='password')
+        response = self.client.get(url)
+        assert response.has_header('ETag')
+        assert not response.has_header('Last-Modified')
+
     def test_size_context(self):
         small_urls = self.urls[:3]
         for url in self.urls:
@@ -943,3 +1085,95 @@ class TestCalendarViews(TestCase):
 
 class TestAgendaViews(TestCase):
     pass
+
+
+class TestPeriodJSONViews(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'TestyMcTesterson',
+            'Testy@test.com',
+            'password'
+        )
+        self.calendar = Calendar.objects.create(name='Test1', slug='t1')
+        self.event = Event.objects.create(
+            name='Event', slug='event', creator=self.user
+        )
+        now = timezone.now()
+        self.base_datetime = (now + relativedelta(years=1)).replace(
+            month=1, day=7, microsecond=0
+        )
+        self.occurrences = [
+            Occurrence.objects.create(
+                calendar=self.calendar, event=self.event, start=dt,
+                finish=dt + timedelta(hours=2)
+            ) for dt in (self.base_datetime,
+                         self.base_datetime + relativedelta(days=1),
+                         self.base_datetime + relativedelta(months=1))
+        ]
+        self.kwargs = {
+            'slug':  self.calendar.slug,
+            'year':  self.base_datetime.year,
+            'month': self.base_datetime.strftime('%b').lower(),
+        }
+
+    def get_json(self, name, **params):
+        response = self.client.get(reverse(name, kwargs=self.kwargs), params)
+        assert_equal(response.status_code, 200)
+        assert_equal(response['Content-Type'], 'application/json')
+        return json.loads(''.join(response.streaming_content))
+
+    def test_month(self):
+        data = self.get_json('month-json', timezone='UTC')
+        assert_equal(data['calendar'], self.calendar.slug)
+        assert_equal(data['period'], 'month')
+        assert_equal(data['timezone'], 'UTC')
+        month = Month(date(self.base_datetime.year, 1, 1))
+        assert_equal(data['start'], month.start.astimezone(pytz.utc).isoformat())
+        assert_equal(data['finish'],
+                     month.finish.astimezone(pytz.utc).isoformat())
+        assert_equal(data['fields'], ['id', 'start', 'finish', 'event', 'url'])
+        assert_equal(data['occurrences'], [
+            [o.pk, o.start.astimezone(pytz.utc).isoformat(),
+             o.finish.astimezone(pytz.utc).isoformat(), 'Event',
+             o.get_absolute_url()]
+            for o in self.occurrences[:2]
+        ])
+
+    def test_periods(self):
+        assert_equal(len(self.get_json('tri-month-json')['occurrences']), 3)
+        del self.kwargs['month']
+        assert_equal(len(self.get_json('year-json')['occurrences']), 3)
+        self.kwargs['week'] = 1
+        assert_equal(self.get_json('week-json')['period'], 'week')
+
+    def test_field_selection(self):
+        data = self.get_json('month-json', fields='id,status')
+        assert_equal(data['fields'], ['id', 'status'])
+        assert_equal(data['occurrences'][0],
+                     [self.occurrences[0].pk, Occurrence.STATUS.published])
+        response = self.client.get(reverse('month-json', kwargs=self.kwargs),
+                                   {'fields': 'id,secret'})
+        assert_equal(response.status_code, 400)
+
+    def test_visibility(self):
+        self.occurrences[0].status = Occurrence.STATUS.hidden
+        self.occurrences[0].save()
+        data = self.get_json('month-json', fields='id')
+        assert_equal(data['occurrences'], [[self.occurrences[1].pk]])
+
+        self.calendar.status = Calendar.STATUS.hidden
+        self.calendar.save()
+        response = self.client.get(reverse('month-json', kwargs=self.kwargs))
+        assert_equal(response.status_code, 404)
+
+    def test_streamed_in_chunks(self):
+        views.api.PeriodJSONMixin.chunk_size = 1
+        try:
+            response = self.client.get(
+                reverse('month-json', kwargs=self.kwargs)
+            )
+            chunks = list(response.streaming_content)
+        finally:
+            views.api.PeriodJSONMixin.chunk_size = 100
+        assert_equal(len(chunks), 4)
+        assert_equal(len(json.loads(''.join(chunks))['occurrences']), 2)
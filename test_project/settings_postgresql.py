@@ -0,0 +1,19 @@
+# Settings for running the tests against PostgreSQL:
+#
+#     DJANGO_SETTINGS_MODULE=test_project.settings_postgresql ./runtests.py
+#
+# The server is found through the usual PG* environment variables.
+import os
+
+from test_project.settings import *
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'NAME': os.environ.get('PGDATABASE', 'calendartools'),
+        'USER': os.environ.get('PGUSER', ''),
+        'PASSWORD': os.environ.get('PGPASSWORD', ''),
+        'HOST': os.environ.get('PGHOST', ''),
+        'PORT': os.environ.get('PGPORT', ''),
+    },
+}